@@ -0,0 +1,166 @@
+"""
+LottoAI API Server
+Asyncio HTTP server for in-memory payloads with ETag revalidation and precompression
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from email.utils import formatdate
+from typing import Any, Callable, Dict, Optional
+
+from output_writer import COMPRESSORS, content_hash
+
+# Seconds between background refreshes
+REFRESH_INTERVAL = 300
+# Longest request head accepted before the connection is dropped
+MAX_HEADER_BYTES = 16384
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT = 30
+
+# Accept-Encoding token for each precompressed sibling, in preference order
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+STATUS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+class Payload:
+    """One response body, encoded and compressed once per refresh"""
+
+    __slots__ = ('body', 'compressed', 'etag', 'content_type')
+
+    def __init__(self, data: Any):
+        if isinstance(data, bytes):
+            self.body = data
+            self.content_type = 'application/octet-stream'
+            self.etag = f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+        else:
+            self.body = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            self.content_type = 'application/json; charset=utf-8'
+            # Weak: unchanged data keeps its ETag even when only timestamps moved
+            self.etag = f'W/"{content_hash(data)[:32]}"'
+        self.compressed = {
+            token: COMPRESSORS[ext](self.body)
+            for token, ext in ENCODINGS if ext in COMPRESSORS
+        }
+
+
+class ApiServer:
+    """Serves {path: data} from memory, rebuilt in the background by `build`
+
+    `build(previous)` runs in a worker thread and returns the new mapping of
+    URL paths to JSON-serializable data or raw bytes; requests keep being
+    answered from the previous snapshot until it completes.
+    """
+
+    def __init__(self, build: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 refresh_interval: float = REFRESH_INTERVAL):
+        self.build = build
+        self.refresh_interval = refresh_interval
+        self.data: Dict[str, Any] = {}
+        self.payloads: Dict[str, Payload] = {}
+        self.refreshed_at: Optional[str] = None
+
+    async def refresh(self):
+        """Rebuild every payload off the event loop and swap them in at once"""
+        data = await asyncio.to_thread(self.build, self.data)
+        payloads = await asyncio.to_thread(lambda: {path: Payload(value) for path, value in data.items()})
+        self.data, self.payloads = data, payloads
+        self.refreshed_at = datetime.now().isoformat()
+        print(f"Refreshed {len(payloads)} payloads at {self.refreshed_at}")
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Refresh failed, serving previous data: {e}")
+
+    async def serve(self, host: str, port: int):
+        """Load the first snapshot, then serve forever"""
+        await self.refresh()
+        server = await asyncio.start_server(self._handle, host, port, limit=MAX_HEADER_BYTES)
+        print(f"Serving on http://{host}:{port}/ (refresh every {self.refresh_interval:g}s)")
+        refresher = asyncio.create_task(self._refresh_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    break
+                keep_alive = self._respond(head, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _respond(self, head: bytes, writer: asyncio.StreamWriter) -> bool:
+        """Write the response for one request head, returns whether to keep the connection"""
+        lines = head.decode('latin-1').split('\r\n')
+        parts = lines[0].split(' ')
+        if len(parts) != 3:
+            self._write(writer, 400, {}, b'', False)
+            return False
+        method, target, version = parts
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            if name:
+                headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        path = target.split('?', 1)[0]
+        if path == '/':
+            path = '/manifest.json'
+
+        if method not in ('GET', 'HEAD'):
+            self._write(writer, 405, {'Allow': 'GET, HEAD'}, b'', keep_alive)
+            return keep_alive
+        payload = self.payloads.get(path)
+        if payload is None:
+            self._write(writer, 404, {}, b'', keep_alive)
+            return keep_alive
+
+        extra = {'ETag': payload.etag, 'Cache-Control': 'public, max-age=60', 'Vary': 'Accept-Encoding'}
+        if payload.etag in (tag.strip() for tag in headers.get('if-none-match', '').split(',')):
+            self._write(writer, 304, extra, b'', keep_alive)
+            return keep_alive
+
+        body = payload.body
+        accepted = {token.split(';')[0].strip() for token in headers.get('accept-encoding', '').split(',')}
+        for token, compressed in payload.compressed.items():
+            if token in accepted:
+                body = compressed
+                extra['Content-Encoding'] = token
+                break
+        extra['Content-Type'] = payload.content_type
+        self._write(writer, 200, extra, body, keep_alive, send_body=method == 'GET')
+        return keep_alive
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], body: bytes,
+               keep_alive: bool, send_body: bool = True):
+        lines = [
+            f'HTTP/1.1 {status} {STATUS[status]}',
+            f'Date: {formatdate(usegmt=True)}',
+            'Server: LottoAI',
+            'Access-Control-Allow-Origin: *',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        if status != 304:
+            lines.append(f'Content-Length: {len(body)}')
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body if send_body else b''))
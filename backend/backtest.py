@@ -0,0 +1,216 @@
+"""
+LottoAI Backtest
+Replay draw history and score each prediction strategy against the real results
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from co_occurrence import CoOccurrenceIndex
+from fetch_pool import run_processes
+from frequency_engine import FrequencyEngine
+
+STRATEGY_IDS = ['frequency', 'cold', 'balanced', 'pattern', 'random']
+
+
+def _pick(rng: np.random.Generator, weights: np.ndarray, taken: np.ndarray, k: int) -> np.ndarray:
+    """Draw k numbers per row without replacement, proportional to weights
+
+    Uses Gumbel top-k: perturbing log-weights and keeping the k largest is
+    equivalent to sequential weighted sampling without replacement.
+    `taken` (trials, width) masks numbers already on each ticket and is
+    updated in place.
+    """
+    trials = taken.shape[0]
+    with np.errstate(divide='ignore'):
+        keys = np.log(np.broadcast_to(weights, taken.shape).astype(np.float64))
+    keys = keys + rng.gumbel(size=taken.shape)
+    keys[taken] = -np.inf
+    picks = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+    taken[np.arange(trials)[:, None], picks] = True
+    return picks
+
+
+def generate_tickets(rng: np.random.Generator, strategy: str, trials: int, hot_cold: Dict,
+                     co_occurrence: CoOccurrenceIndex, main_range: Tuple[int, int],
+                     special_range: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Tickets for one strategy: the published predictions, the backtest and bulk sampling all use this
+
+    Returns (trials, 5) main numbers and (trials,) special balls. Tickets
+    stay within `main_range` even when the analysis covers draws from an
+    older, wider range.
+    """
+    width = main_range[1] + 1
+    uniform = np.zeros(width)
+    uniform[main_range[0]:] = 1.0
+    taken = np.zeros((trials, width), dtype=bool)
+    special_pool = np.arange(special_range[0], special_range[1] + 1)
+
+    def subset(numbers: List[int]) -> np.ndarray:
+        weights = np.zeros(width)
+        weights[numbers] = 1.0
+        return weights
+
+    hot_main = [n for n in hot_cold['hot_numbers']['main'] if main_range[0] <= n <= main_range[1]]
+    cold_main = hot_cold['cold_numbers']['main']
+    parts = []
+
+    if strategy == 'frequency':
+        if hot_main:
+            parts.append(_pick(rng, subset(hot_main), taken, min(3, len(hot_main))))
+        special_choices = [n for n in hot_cold['hot_numbers']['special']
+                           if special_range[0] <= n <= special_range[1]] or special_pool
+    elif strategy == 'cold':
+        if cold_main:
+            parts.append(_pick(rng, subset(cold_main), taken, min(3, len(cold_main))))
+        special_choices = hot_cold['cold_numbers']['special'] or special_pool
+    elif strategy == 'balanced':
+        if hot_main:
+            parts.append(_pick(rng, subset(hot_main), taken, min(2, len(hot_main))))
+        cold_left = [n for n in cold_main if n not in hot_main]
+        if cold_left:
+            parts.append(_pick(rng, subset(cold_left), taken, min(2, len(cold_left))))
+        special_choices = special_pool
+    elif strategy == 'pattern':
+        # Seed with a frequent triplet (or one random number), then add one number
+        # at a time weighted by pair affinity to everything already on the ticket
+        triplets = [t for t in co_occurrence.top_triplets(10) if max(t['numbers']) <= main_range[1]]
+        if triplets:
+            seeds = np.array([t['numbers'] for t in triplets])[rng.integers(len(triplets), size=trials)]
+            taken[np.arange(trials)[:, None], seeds] = True
+            parts.append(seeds)
+        else:
+            parts.append(_pick(rng, uniform, taken, 1))
+        while sum(p.shape[1] for p in parts) < 5:
+            chosen = np.concatenate(parts, axis=1)
+            affinity = co_occurrence.pairs[chosen][..., :width].sum(axis=1).astype(np.float64) + 1.0
+            affinity[:, :main_range[0]] = 0.0
+            parts.append(_pick(rng, affinity, taken, 1))
+        special_choices = special_pool
+    else:
+        special_choices = special_pool
+
+    chosen = sum(p.shape[1] for p in parts)
+    if chosen < 5:
+        parts.append(_pick(rng, uniform, taken, 5 - chosen))
+
+    main = np.concatenate(parts, axis=1)[:, :5]
+    special = np.asarray(special_choices)[rng.integers(len(special_choices), size=trials)]
+    validate_tickets(main, special, main_range, special_range)
+    return main, special
+
+
+def validate_tickets(main: np.ndarray, special: np.ndarray, main_range: Tuple[int, int],
+                     special_range: Tuple[int, int]):
+    """Raise ValueError unless every ticket has five distinct in-range numbers and an in-range special"""
+    ordered = np.sort(main, axis=1)
+    if (main.shape[1:] != (5,) or (ordered[:, 1:] == ordered[:, :-1]).any()
+            or (main < main_range[0]).any() or (main > main_range[1]).any()
+            or (special < special_range[0]).any() or (special > special_range[1]).any()):
+        raise ValueError("Generated tickets break the game's number constraints")
+
+
+def _run_chunk(history: List[Dict], start: int, stop: int, trials: int, lookback: int,
+               main_range: Tuple[int, int], special_range: Tuple[int, int],
+               seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """Score draws [start, stop) of an oldest-first history
+
+    Returns per strategy a (6, 2) histogram of main matches by special hit.
+    """
+    rng = np.random.default_rng(seed)
+    # Wide enough for draws from older, larger number ranges
+    width = max([main_range[1]] + [max(d['numbers']) for d in history]) + 1
+    co_occurrence = CoOccurrenceIndex(width - 1)
+    co_occurrence.update(history[:start])
+    results = {s: np.zeros((6, 2), dtype=np.int64) for s in STRATEGY_IDS}
+
+    for i in range(start, stop):
+        # Only draws before i are visible, newest first like the live service
+        prior = history[max(0, i - lookback):i][::-1]
+        engine = FrequencyEngine(prior, main_range, special_range)
+        hot_cold = engine.analyze([lookback])[str(lookback)]
+
+        actual = history[i]
+        drawn = np.zeros(width, dtype=bool)
+        drawn[actual['numbers']] = True
+
+        for strategy in STRATEGY_IDS:
+            main, special = generate_tickets(rng, strategy, trials, hot_cold, co_occurrence,
+                                             main_range, special_range)
+            matches = drawn[main].sum(axis=1)
+            special_hit = (special == actual['special']).astype(np.intp)
+            np.add.at(results[strategy], (matches, special_hit), 1)
+
+        co_occurrence.update([actual])
+
+    return results
+
+
+def run_backtest(history: List[Dict], main_range: Tuple[int, int], special_range: Tuple[int, int],
+                 trials: int = 200, lookback: int = 50, workers: Optional[int] = None,
+                 seed: int = 0) -> Dict:
+    """Replay history across a process pool and summarize each strategy
+
+    `history` is newest-first as held by LotteryService. Draws are scored
+    from index `lookback` on so every step has a full hot/cold window.
+    """
+    ordered = sorted(history, key=lambda d: d['date'])
+    start = min(lookback, len(ordered))
+    steps = len(ordered) - start
+    workers = workers or os.cpu_count() or 1
+
+    totals = {s: np.zeros((6, 2), dtype=np.int64) for s in STRATEGY_IDS}
+    if steps > 0:
+        bounds = np.linspace(start, len(ordered), min(workers * 4, steps) + 1).astype(int)
+        chunks = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+        results = run_processes(_run_chunk, {
+            f'{a}-{b}': (ordered, a, b, trials, lookback, main_range, special_range, chunk_seed)
+            for (a, b), chunk_seed in zip(chunks, seeds)
+        }, max_workers=workers)
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+            for strategy, histogram in result.items():
+                totals[strategy] += histogram
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'draws_tested': steps,
+        'trials_per_draw': trials,
+        'lookback': lookback,
+        'first_draw': ordered[start]['date'] if steps > 0 else None,
+        'last_draw': ordered[-1]['date'] if steps > 0 else None,
+        'baseline': _baseline(main_range, special_range),
+        'strategies': {s: _summarize(h) for s, h in totals.items()}
+    }
+
+
+def _summarize(histogram: np.ndarray) -> Dict:
+    total = int(histogram.sum())
+    if not total:
+        return {'tickets': 0}
+    by_matches = histogram.sum(axis=1)
+    # Prize tiers in both games: 3+ main numbers, or any ticket hitting the special ball
+    prizes = int(histogram[3:].sum() + histogram[:3, 1].sum())
+    return {
+        'tickets': total,
+        'avg_matches': round(float((by_matches * np.arange(6)).sum()) / total, 4),
+        'special_hit_rate': round(float(histogram[:, 1].sum()) / total, 4),
+        'prize_rate': round(prizes / total, 4),
+        'match_distribution': {str(m): int(by_matches[m]) for m in range(6)}
+    }
+
+
+def _baseline(main_range: Tuple[int, int], special_range: Tuple[int, int]) -> Dict:
+    """Expected values for uniformly random tickets"""
+    pool = main_range[1] - main_range[0] + 1
+    specials = special_range[1] - special_range[0] + 1
+    return {
+        'avg_matches': round(5 * 5 / pool, 4),
+        'special_hit_rate': round(1 / specials, 4)
+    }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+LottoAI Benchmarks
+Times each pipeline stage offline against a stand-in server at synthetic history sizes
+
+Usage:
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py                       # compare with the saved baseline
+    python benchmarks/run_benchmarks.py --sizes 100,1000 --repeat 5
+    python benchmarks/run_benchmarks.py --record              # refresh fixtures from the live sites
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import platform
+import tempfile
+import argparse
+import contextlib
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lottery_service
+from co_occurrence import CoOccurrenceIndex
+from draw_archive import archive_path, open_archive
+from frequency_engine import FrequencyEngine
+from history_export import export_history
+from history_store import HistoryStore
+from lottery_service import HOT_COLD_WINDOWS, LOTTERY_CONFIG, LotteryService, lottery_files
+from output_writer import write_json
+from stand_in import SocrataDataset, StandInAdapter, StandInServer, record_fixtures, synthetic_records
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# Slowdown ratio over baseline reported as a regression
+TOLERANCE = 0.25
+# Differences below this many seconds are treated as noise
+NOISE_FLOOR = 0.005
+
+STAGES = ['fetch', 'sync_noop', 'parse', 'hot_cold', 'hot_cold_cached', 'archive', 'co_occurrence',
+          'predictions', 'wheel', 'serialization']
+
+
+class BodyResponse:
+    """Just enough of requests.Response for the streaming parsers"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.encoding = 'utf-8'
+
+    def iter_content(self, chunk_size: int = 8192):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+def timed(fn: Callable) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def bench_size(lottery_type: str, dataset: SocrataDataset, size: int, workdir: str) -> Dict[str, float]:
+    """One timing of every stage on a fresh store and HTTP cache"""
+    config = LOTTERY_CONFIG[lottery_type]
+    service = LotteryService(lottery_type, HistoryStore(os.path.join(workdir, 'history.db')))
+    timings = {}
+
+    # Jackpot race plus full history sync into the store, including the co-occurrence index
+    timings['fetch'] = timed(lambda: (service.fetch_jackpot(), service.fetch_history()))
+    if len(service.history) != size:
+        raise RuntimeError(f"Expected {size} draws from the stand-in, loaded {len(service.history)}")
+    # Incremental sync with nothing new: one request plus a store load
+    timings['sync_noop'] = timed(service.fetch_history)
+
+    body = dataset.query({'$limit': str(size)})
+    timings['parse'] = timed(lambda: service._parse_history_page(BodyResponse(body)))
+
+    def hot_cold():
+        service._frequency = None
+        service._fingerprint = None
+        service.get_hot_cold_numbers(windows=HOT_COLD_WINDOWS)
+    timings['hot_cold'] = timed(hot_cold)
+    # Same history again, as on a run with no new draw: fingerprint plus a stats cache hit
+    timings['hot_cold_cached'] = timed(hot_cold)
+    # Frequency tables straight from the memory-mapped archive written by the sync
+    timings['archive'] = timed(lambda: FrequencyEngine.from_records(
+        open_archive(archive_path(workdir, lottery_type)), config['main_range'], config['special_range']))
+
+    timings['co_occurrence'] = timed(
+        lambda: CoOccurrenceIndex(config['main_range'][1]).update(service.history))
+    timings['predictions'] = timed(service.generate_predictions)
+    # Default wheel for the hot pool, served from the bundled wheels
+    timings['wheel'] = timed(service.generate_wheel)
+
+    def serialize():
+        lottery_dir = os.path.join(workdir, 'public', lottery_type)
+        for name, data in lottery_files(service, lottery_dir).items():
+            write_json(data, os.path.join(lottery_dir, name))
+        export_history(service.history, lottery_dir)
+    timings['serialization'] = timed(serialize)
+    return timings
+
+
+def run(lottery_type: str, sizes: List[int], repeat: int) -> Dict:
+    """Best-of-`repeat` seconds per stage for each history size"""
+    config = LOTTERY_CONFIG[lottery_type]
+    results = {}
+    for size in sizes:
+        dataset = SocrataDataset(synthetic_records(size, config['main_range'], config['special_range'],
+                                                   config['special_field']))
+        dataset_id = config['api_url'].rsplit('/', 1)[1]
+        best: Dict[str, float] = {}
+        with StandInServer({dataset_id: dataset}) as server:
+            adapter = StandInAdapter(server.base_url)
+            lottery_service.http.session.mount('https://', adapter)
+            lottery_service.http.session.mount('http://', adapter)
+            for _ in range(repeat):
+                workdir = tempfile.mkdtemp(prefix='lottoai-bench-')
+                try:
+                    timings = bench_size(lottery_type, dataset, size, workdir)
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                for stage, seconds in timings.items():
+                    best[stage] = min(seconds, best.get(stage, seconds))
+        results[str(size)] = {stage: round(best[stage], 6) for stage in STAGES}
+        print(f"{size:>7} draws  " + '  '.join(f"{stage} {best[stage] * 1000:8.1f}ms" for stage in STAGES))
+    return {
+        'lottery': lottery_type,
+        'generated_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+        'sizes': results
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = TOLERANCE) -> List[str]:
+    """Print stage-by-stage change against the baseline, returns the regressions"""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('generated_at')} "
+          f"(python {baseline.get('python')}, {baseline.get('cpus')} cpus)")
+    for size, stages in current['sizes'].items():
+        old = baseline.get('sizes', {}).get(size)
+        if not old:
+            print(f"{size:>7} draws  no baseline")
+            continue
+        cells = []
+        for stage in STAGES:
+            if stage not in old:
+                continue
+            change = stages[stage] / old[stage] - 1 if old[stage] else 0.0
+            slower = change > tolerance and stages[stage] - old[stage] > NOISE_FLOOR
+            cells.append(f"{stage} {change:+7.1%}{' !' if slower else '  '}")
+            if slower:
+                regressions.append(f"{stage} at {size} draws: {old[stage] * 1000:.1f}ms -> {stages[stage] * 1000:.1f}ms")
+        print(f"{size:>7} draws  " + ' '.join(cells))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LottoAI offline pipeline benchmarks')
+    parser.add_argument('--lottery', choices=list(LOTTERY_CONFIG), default='powerball')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated synthetic history sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size, the fastest is kept')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='Slowdown ratio reported as a regression (default: 0.25)')
+    parser.add_argument('--json-out', help='Also write the results to this file')
+    parser.add_argument('--record', action='store_true', help='Refresh fixtures from the live sites and exit')
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(lottery_service.http.session)
+        return
+
+    results = run(args.lottery, [int(s) for s in args.sizes.split(',')], args.repeat)
+    if args.json_out:
+        write_json(results, args.json_out, compress=False)
+
+    if args.save_baseline:
+        write_json(results, args.baseline, compress=False)
+        print(f"\nSaved baseline: {args.baseline}")
+        return
+
+    try:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print(f"\nNo baseline at {args.baseline}, run with --save-baseline to create one")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
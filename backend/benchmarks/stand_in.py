@@ -0,0 +1,164 @@
+"""
+LottoAI Stand-in Server
+Local replacement for the lottery sites and Socrata datasets, serving fixtures and synthetic history
+"""
+
+import os
+import re
+import json
+import random
+import hashlib
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# (host, path) -> (fixture file, live URL used by --record)
+FIXTURES = {
+    ('www.powerball.com', '/api/v1/estimates/powerball'):
+        ('powerball_estimates.json', 'https://www.powerball.com/api/v1/estimates/powerball?_format=json'),
+    ('www.powerball.com', '/api/v1/numbers/powerball/recent'):
+        ('powerball_recent.json', 'https://www.powerball.com/api/v1/numbers/powerball/recent?_format=json'),
+    ('www.powerball.com', '/'): ('powerball_home.html', 'https://www.powerball.com/'),
+    ('www.megamillions.com', '/cmspages/utilservice.asmx/GetLatestDrawData'):
+        ('mega_millions_latest.json', 'https://www.megamillions.com/cmspages/utilservice.asmx/GetLatestDrawData'),
+    ('www.megamillions.com', '/'): ('megamillions_home.html', 'https://www.megamillions.com/'),
+    ('www.lottery.net', '/powerball/numbers'):
+        ('lottery_net_powerball.html', 'https://www.lottery.net/powerball/numbers'),
+    ('www.lottery.net', '/mega-millions/numbers'):
+        ('lottery_net_mega-millions.html', 'https://www.lottery.net/mega-millions/numbers'),
+}
+
+
+def synthetic_records(size: int, main_range: Tuple[int, int], special_range: Tuple[int, int],
+                      special_field: Optional[str], seed: int = 0) -> List[Dict]:
+    """`size` daily draws in Socrata's record format, oldest first, ending 2025-12-31"""
+    rng = random.Random(seed)
+    first = date(2025, 12, 31) - timedelta(days=size - 1)
+    records = []
+    for i in range(size):
+        numbers = sorted(rng.sample(range(main_range[0], main_range[1] + 1), 5))
+        special = rng.randint(*special_range)
+        record = {'draw_date': f'{first + timedelta(days=i)}T00:00:00.000',
+                  'winning_numbers': ' '.join(f'{n:02d}' for n in numbers)}
+        if special_field:
+            record[special_field] = f'{special:02d}'
+        else:
+            record['winning_numbers'] += f' {special:02d}'
+        records.append(record)
+    return records
+
+
+class SocrataDataset:
+    """Answers the subset of SoQL the service sends: $where/$order/$limit/$offset/$select max()"""
+
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        self.dates = [r['draw_date'] for r in records]
+
+    def query(self, params: Dict[str, str]) -> bytes:
+        if params.get('$select', '').startswith('max(draw_date)'):
+            return json.dumps([{'latest': self.dates[-1]}] if self.dates else [{}]).encode('utf-8')
+
+        rows = self.records
+        where = re.match(r"draw_date > '([^']+)'", params.get('$where', ''))
+        if where:
+            rows = [r for r in rows if r['draw_date'] > where.group(1)]
+        offset = int(params.get('$offset', 0))
+        limit = int(params.get('$limit', 1000))
+        return json.dumps(rows[offset:offset + limit]).encode('utf-8')
+
+
+class StandInServer:
+    """Threaded local HTTP server; requests for real hosts arrive as /{host}{path}"""
+
+    def __init__(self, datasets: Dict[str, SocrataDataset], fixture_dir: str = FIXTURE_DIR):
+        self.datasets = datasets
+        self.fixtures = {}
+        for key, (filename, _) in FIXTURES.items():
+            with open(os.path.join(fixture_dir, filename), 'rb') as f:
+                self.fixtures[key] = f.read()
+        self.requests = 0
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stand_in.requests += 1
+                status, body, content_type = stand_in.route(self.path)
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def route(self, target: str) -> Tuple[int, bytes, str]:
+        parts = urlsplit(target)
+        host, _, path = parts.path.lstrip('/').partition('/')
+        path = '/' + path
+        params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+
+        if host == 'data.ny.gov' and path.startswith('/resource/'):
+            dataset = self.datasets.get(path[len('/resource/'):])
+            if dataset:
+                return 200, dataset.query(params), 'application/json'
+        body = self.fixtures.get((host, path))
+        if body is not None:
+            content_type = 'text/html' if path.endswith('/') or path.endswith('numbers') else 'application/json'
+            return 200, body, content_type
+        return 404, b'Not found', 'text/plain'
+
+    def __enter__(self) -> 'StandInServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StandInAdapter(HTTPAdapter):
+    """Transport adapter that sends every request to the stand-in server instead"""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f'{self.base_url}/{parts.netloc}{parts.path or "/"}' + (f'?{parts.query}' if parts.query else '')
+        # Proxies from the environment were chosen for the original host
+        kwargs['proxies'] = {}
+        return super().send(request, **kwargs)
+
+
+def record_fixtures(session, fixture_dir: str = FIXTURE_DIR):
+    """Refresh the fixtures from the live sites"""
+    for filename, url in FIXTURES.values():
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        with open(os.path.join(fixture_dir, filename), 'wb') as f:
+            f.write(response.content)
+        print(f"Recorded {url} -> {filename} ({len(response.content)} bytes)")
@@ -0,0 +1,100 @@
+"""
+LottoAI Bulk Predictions
+Batched, reproducible ticket sampling streamed as NDJSON
+"""
+
+import json
+import hashlib
+from typing import Callable, Dict, Iterator, Optional, TextIO, Tuple
+
+import numpy as np
+
+from backtest import STRATEGY_IDS, _pick, generate_tickets
+from co_occurrence import CoOccurrenceIndex
+from frequency_engine import FrequencyEngine, Window
+
+# Tickets sampled per vectorized batch
+BATCH_SIZE = 50_000
+
+# Strategies beyond the published ones: draw all five numbers in proportion to frequency
+WEIGHTED_STRATEGIES = ['hot_weighted', 'cold_weighted']
+BULK_STRATEGIES = STRATEGY_IDS + WEIGHTED_STRATEGIES
+
+
+def request_seed(*parts: object) -> np.random.SeedSequence:
+    """Seed derived from request fields, identical across runs and machines"""
+    digest = hashlib.sha256(':'.join(str(p) for p in parts).encode('utf-8')).digest()
+    return np.random.SeedSequence(int.from_bytes(digest[:16], 'little'))
+
+
+class BulkSampler:
+    """Samples ticket batches without replacement from frequency-weighted distributions"""
+
+    def __init__(self, engine: FrequencyEngine, co_occurrence: CoOccurrenceIndex,
+                 main_range: Tuple[int, int], special_range: Tuple[int, int], window: Window = 50):
+        self.co_occurrence = co_occurrence
+        self.main_range = main_range
+        self.special_range = special_range
+        self.hot_cold = engine.analyze([window])[str(window)]
+
+        main_counts, special_counts = engine.counts([window])
+        self.main_weights = self._weights(main_counts[0], main_range)
+        self.special_weights = self._weights(special_counts[0], special_range)
+
+    @staticmethod
+    def _weights(counts: np.ndarray, value_range: Tuple[int, int]) -> Dict[str, np.ndarray]:
+        # Add-one smoothing keeps every number drawable; cold weights mirror hot ones
+        lo, hi = value_range
+        counts = counts[:hi + 1].astype(np.float64)
+        counts[:lo] = 0.0
+        hot = np.where(np.arange(hi + 1) >= lo, counts + 1.0, 0.0)
+        cold = np.where(np.arange(hi + 1) >= lo, counts[lo:].max() - counts + 1.0, 0.0)
+        return {'hot_weighted': hot, 'cold_weighted': cold}
+
+    def sample(self, rng: np.random.Generator, strategy: str, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(count, 5) sorted main numbers and (count,) special balls"""
+        if strategy in WEIGHTED_STRATEGIES:
+            taken = np.zeros((count, self.main_range[1] + 1), dtype=bool)
+            main = _pick(rng, self.main_weights[strategy], taken, 5)
+            special_weights = self.special_weights[strategy]
+            special = rng.choice(len(special_weights), size=count, p=special_weights / special_weights.sum())
+        elif strategy in STRATEGY_IDS:
+            main, special = generate_tickets(rng, strategy, count, self.hot_cold, self.co_occurrence,
+                                             self.main_range, self.special_range)
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        return np.sort(main, axis=1), special
+
+    def iter_tickets(self, seed: np.random.SeedSequence, strategy: str, count: int,
+                     batch_size: int = BATCH_SIZE) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield batches totalling `count` tickets
+
+        Batch i is sampled from child seed i, so any batch can be
+        regenerated on its own for the same seed and batch size.
+        """
+        # Child seeds are derived, not spawned, so reusing a SeedSequence repeats the output
+        for i, start in enumerate(range(0, count, batch_size)):
+            child = np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key + (i,))
+            yield self.sample(np.random.default_rng(child), strategy, min(batch_size, count - start))
+
+
+def write_ndjson(sampler: BulkSampler, out: TextIO, seed: np.random.SeedSequence, strategy: str,
+                 count: int, extra: Optional[Dict] = None, batch_size: int = BATCH_SIZE,
+                 on_batch: Optional[Callable[[np.ndarray, np.ndarray], None]] = None) -> int:
+    """Stream tickets as one JSON object per line, returns tickets written
+
+    `on_batch(main, special)` sees every batch, e.g. to collect ticket ranks.
+    """
+    # Shared fields are encoded once and spliced into every line
+    suffix = ''.join(f',{json.dumps(k)}:{json.dumps(v)}' for k, v in {'strategy': strategy, **(extra or {})}.items())
+    written = 0
+    for main, special in sampler.iter_tickets(seed, strategy, count, batch_size):
+        out.writelines(
+            f'{{"ticket":{written + i + 1},"numbers":[{",".join(map(str, numbers))}],'
+            f'"special_ball":{ball}{suffix}}}\n'
+            for i, (numbers, ball) in enumerate(zip(main.tolist(), special.tolist()))
+        )
+        written += len(main)
+        if on_batch:
+            on_batch(main, special)
+    return written
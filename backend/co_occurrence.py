@@ -0,0 +1,137 @@
+"""
+LottoAI Co-occurrence Index
+Pair matrix and sparse triplet counts over draw history, updated incrementally
+"""
+
+import os
+import heapq
+import tempfile
+from itertools import combinations
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PAIR_SLOTS = np.array(list(combinations(range(5), 2)), dtype=np.intp)
+TRIPLET_SLOTS = np.array(list(combinations(range(5), 3)), dtype=np.intp)
+
+
+class CoOccurrenceIndex:
+    """How often numbers were drawn together, for pairs and triplets
+
+    Only draws newer than `last_date` are folded in on update, so a run
+    with one new draw costs ten pair and ten triplet increments. The
+    matrix grows to fit any larger number it meets (e.g. draws from an
+    older, wider number range), so `max_number` is only the starting size.
+    """
+
+    def __init__(self, max_number: int):
+        self.width = max_number + 1
+        self.pairs = np.zeros((self.width, self.width), dtype=np.int32)
+        self.triplets: Dict[int, int] = {}
+        self.draws = 0
+        self.last_date: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str, max_number: int) -> 'CoOccurrenceIndex':
+        """Load a persisted index (at least `max_number` wide), or return an empty one"""
+        index = cls(max_number)
+        if not os.path.exists(path):
+            return index
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                pairs = data['pairs']
+                if pairs.ndim != 2 or pairs.shape[0] != pairs.shape[1]:
+                    return index
+                index.width = pairs.shape[0]
+                index.pairs = pairs.astype(np.int32)
+                index.triplets = dict(zip(data['triplet_keys'].tolist(),
+                                          data['triplet_counts'].tolist()))
+                index.draws = int(data['draws'])
+                index.last_date = str(data['last_date']) or None
+            index._grow(max_number + 1)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"  Could not load co-occurrence index: {e}")
+            return cls(max_number)
+        return index
+
+    def save(self, path: str):
+        """Persist the index atomically"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.npz')
+        os.close(fd)
+        np.savez_compressed(
+            tmp,
+            pairs=self.pairs,
+            triplet_keys=np.fromiter(self.triplets.keys(), dtype=np.int64, count=len(self.triplets)),
+            triplet_counts=np.fromiter(self.triplets.values(), dtype=np.int32, count=len(self.triplets)),
+            draws=self.draws,
+            last_date=self.last_date or ''
+        )
+        os.replace(tmp, path)
+
+    def update(self, history: List[Dict]) -> int:
+        """Fold in draws newer than the last indexed date, returns draws added"""
+        new = [d for d in history if not self.last_date or d['date'] > self.last_date]
+        if not new:
+            return 0
+
+        main = np.sort(np.array([d['numbers'][:5] for d in new], dtype=np.int64), axis=1)
+        if main.min() < 0:
+            raise ValueError(f"Number {main.min()} outside index range")
+        self._grow(int(main.max()) + 1)
+
+        pair_a, pair_b = main[:, PAIR_SLOTS[:, 0]].ravel(), main[:, PAIR_SLOTS[:, 1]].ravel()
+        np.add.at(self.pairs, (pair_a, pair_b), 1)
+        np.add.at(self.pairs, (pair_b, pair_a), 1)
+
+        trips = main[:, TRIPLET_SLOTS]
+        keys = (trips[..., 0] * self.width + trips[..., 1]) * self.width + trips[..., 2]
+        for key, count in zip(*np.unique(keys, return_counts=True)):
+            key = int(key)
+            self.triplets[key] = self.triplets.get(key, 0) + int(count)
+
+        self.draws += len(new)
+        self.last_date = max(d['date'] for d in new)
+        return len(new)
+
+    def _grow(self, width: int):
+        """Widen the pair matrix to `width` numbers, re-keying triplets"""
+        if width <= self.width:
+            return
+        pairs = np.zeros((width, width), dtype=np.int32)
+        pairs[:self.width, :self.width] = self.pairs
+        triplets = {}
+        for key, count in self.triplets.items():
+            a, b, c = self._decode(key)
+            triplets[(a * width + b) * width + c] = count
+        self.pairs, self.triplets, self.width = pairs, triplets, width
+
+    def _decode(self, key: int) -> Tuple[int, int, int]:
+        ab, c = divmod(key, self.width)
+        a, b = divmod(ab, self.width)
+        return a, b, c
+
+    def top_pairs(self, limit: int = 20) -> List[Dict]:
+        """Most frequent pairs"""
+        upper = np.triu(self.pairs, k=1)
+        flat = np.argsort(upper, axis=None, kind='stable')[::-1][:limit]
+        rows, cols = np.unravel_index(flat, upper.shape)
+        return [
+            {'numbers': [int(a), int(b)], 'count': int(upper[a, b])}
+            for a, b in zip(rows, cols) if upper[a, b] > 0
+        ]
+
+    def top_triplets(self, limit: int = 20) -> List[Dict]:
+        """Most frequent triplets"""
+        ranked = heapq.nsmallest(limit, self.triplets.items(), key=lambda kv: (-kv[1], kv[0]))
+        return [{'numbers': list(self._decode(key)), 'count': count} for key, count in ranked]
+
+    def partners(self, number: int, limit: int = 5) -> List[Dict]:
+        """Numbers most often drawn together with `number`"""
+        row = self.pairs[number]
+        order = np.argsort(row, kind='stable')[::-1][:limit]
+        return [{'number': int(n), 'count': int(row[n])} for n in order if row[n] > 0]
+
+    def affinity(self, chosen: List[int]) -> np.ndarray:
+        """Summed pair counts of every number against a chosen set"""
+        return self.pairs[chosen].sum(axis=0)
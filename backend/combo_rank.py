@@ -0,0 +1,84 @@
+"""
+LottoAI Combination Rank
+Dense integer ranks for 5-number combinations plus special ball, vectorized with NumPy
+"""
+
+from math import comb
+from typing import Sequence, Tuple
+
+import numpy as np
+
+MAIN_COUNT = 5
+
+
+class ComboIndex:
+    """Dense integer ranks for tickets of one game's number ranges
+
+    Main numbers use the combinatorial number system: sorted zero-based
+    numbers c0 < ... < c4 rank as C(c0, 1) + C(c1, 2) + ... + C(c4, 5),
+    giving 0 .. C(n, 5) - 1 (11,238,513 combinations for 5-of-69). A full
+    ticket ranks as main_rank * specials + (special - lowest special).
+    """
+
+    def __init__(self, main_range: Tuple[int, int], special_range: Tuple[int, int]):
+        self.main_range = main_range
+        self.special_range = special_range
+        self.numbers = main_range[1] - main_range[0] + 1
+        self.specials = special_range[1] - special_range[0] + 1
+        self.main_size = comb(self.numbers, MAIN_COUNT)
+        self.size = self.main_size * self.specials
+        # binom[c, k] = C(c, k)
+        self.binom = np.array([[comb(c, k) for k in range(MAIN_COUNT + 1)] for c in range(self.numbers)],
+                              dtype=np.int64)
+
+    def rank_main(self, numbers: Sequence) -> np.ndarray:
+        """Ranks of an (n, 5) array of main numbers in any order within each row"""
+        main = np.sort(np.asarray(numbers, dtype=np.int64).reshape(-1, MAIN_COUNT), axis=1) - self.main_range[0]
+        if main.size and (main.min() < 0 or main.max() >= self.numbers
+                          or (np.diff(main, axis=1) == 0).any()):
+            raise ValueError(f"Main numbers must be {MAIN_COUNT} distinct values in {self.main_range}")
+        return self.binom[main, np.arange(1, MAIN_COUNT + 1)].sum(axis=1)
+
+    def rank(self, numbers: Sequence, special: Sequence) -> np.ndarray:
+        """Full ticket ranks (int64) for (n, 5) main numbers and (n,) special balls"""
+        special = np.asarray(special, dtype=np.int64).reshape(-1) - self.special_range[0]
+        if special.size and (special.min() < 0 or special.max() >= self.specials):
+            raise ValueError(f"Special ball outside {self.special_range}")
+        return self.rank_main(numbers) * self.specials + special
+
+
+class ComboSet:
+    """Membership bitmap over main ranks, one bit per combination (1.4 MB for 5-of-69)"""
+
+    def __init__(self, size: int, ranks: Sequence = ()):
+        self.size = size
+        self.bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+        self.add(ranks)
+
+    def add(self, ranks: Sequence):
+        ranks = np.asarray(ranks, dtype=np.int64).reshape(-1)
+        np.bitwise_or.at(self.bits, ranks >> 3, (1 << (ranks & 7)).astype(np.uint8))
+
+    def contains(self, ranks: Sequence) -> np.ndarray:
+        """Boolean membership for each rank, O(1) per rank"""
+        ranks = np.asarray(ranks, dtype=np.int64).reshape(-1)
+        return ((self.bits[ranks >> 3] >> (ranks & 7).astype(np.uint8)) & 1).astype(bool)
+
+    def __contains__(self, rank: int) -> bool:
+        return bool(self.contains([rank])[0])
+
+    def __len__(self) -> int:
+        return int(np.bitwise_count(self.bits).sum())
+
+    def ranks(self) -> np.ndarray:
+        """Sorted member ranks, unpacking only the non-empty bytes"""
+        occupied = np.flatnonzero(self.bits)
+        rows, bits = np.nonzero(np.unpackbits(self.bits[occupied, None], axis=1, bitorder='little'))
+        return occupied[rows] * 8 + bits
+
+
+def dedupe(ranks: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """Unique ranks in first-seen order and the index of each one's first occurrence"""
+    unique, first = np.unique(np.asarray(ranks, dtype=np.int64), return_index=True)
+    order = np.argsort(first, kind='stable')
+    return unique[order], first[order]
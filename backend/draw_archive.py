@@ -0,0 +1,117 @@
+"""
+LottoAI Draw Archive
+Fixed-width binary draw records on disk, opened via mmap as a NumPy structured array
+"""
+
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from jackpot_index import parse_amount
+from output_writer import atomic_write
+
+# Packed little-endian record, 18 bytes: yyyymmdd date, five main numbers, special ball, jackpot in dollars
+ARCHIVE_DTYPE = np.dtype([('date', '<i4'), ('numbers', 'u1', (5,)), ('special', 'u1'), ('jackpot', '<i8')])
+# Jackpot value for draws whose jackpot is not known
+JACKPOT_UNKNOWN = -1
+
+# 20-byte header: magic, format version, record size, record count, newest draw date as yyyymmdd (0 if empty)
+MAGIC = b'LTA1'
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u4'), ('record_size', '<u4'), ('count', '<u4'),
+                         ('checkpoint', '<u4')])
+VERSION = 2
+
+
+def archive_path(data_dir: str, lottery_type: str) -> str:
+    return os.path.join(data_dir, f'draws_{lottery_type}.lta')
+
+
+def _encode_records(draws: List[Dict]) -> np.ndarray:
+    ordered = sorted(draws, key=lambda d: d['date'])
+    records = np.zeros(len(ordered), dtype=ARCHIVE_DTYPE)
+    records['date'] = [int(d['date'].replace('-', '')) for d in ordered]
+    records['numbers'] = [d['numbers'][:5] for d in ordered]
+    records['special'] = [d['special'] for d in ordered]
+    amounts = [parse_amount(d.get('jackpot')) for d in ordered]
+    records['jackpot'] = [JACKPOT_UNKNOWN if a is None else a for a in amounts]
+    return records
+
+
+def _encode_header(count: int, checkpoint: int) -> bytes:
+    return np.array([(MAGIC, VERSION, ARCHIVE_DTYPE.itemsize, count, checkpoint)], dtype=HEADER_DTYPE).tobytes()
+
+
+def encode_archive(history: List[Dict]) -> bytes:
+    """Header plus records oldest-first for draws in any order"""
+    records = _encode_records(history)
+    return _encode_header(len(records), int(records['date'][-1]) if len(records) else 0) + records.tobytes()
+
+
+def write_archive(path: str, history: List[Dict]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    atomic_write(path, encode_archive(history))
+
+
+def append_archive(path: str, draws: List[Dict]):
+    """Append draws newer than the archive's checkpoint, then the header that counts them
+
+    A crash between the two leaves a size the header doesn't account for,
+    which read_header rejects, so the archive is rebuilt rather than misread.
+    """
+    header = read_header(path)
+    records = _encode_records(draws)
+    if header is None or (len(records) and _iso_date(int(records['date'][0])) <= (header['checkpoint'] or '')):
+        raise ValueError(f"{path}: can only append draws newer than the archive's checkpoint")
+    if not len(records):
+        return
+    with open(path, 'r+b') as f:
+        f.seek(HEADER_DTYPE.itemsize + header['count'] * ARCHIVE_DTYPE.itemsize)
+        f.write(records.tobytes())
+        f.flush()
+        f.seek(0)
+        f.write(_encode_header(header['count'] + len(records), int(records['date'][-1])))
+
+
+def read_header(path: str) -> Optional[Dict]:
+    """{'count', 'checkpoint'} of a valid archive (checkpoint as YYYY-MM-DD or None), None otherwise"""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    if size < HEADER_DTYPE.itemsize:
+        return None
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+    count = int(header['count'])
+    if (header['magic'] != MAGIC or header['version'] != VERSION
+            or header['record_size'] != ARCHIVE_DTYPE.itemsize
+            or size != HEADER_DTYPE.itemsize + count * ARCHIVE_DTYPE.itemsize):
+        return None
+    checkpoint = int(header['checkpoint'])
+    return {'count': count, 'checkpoint': _iso_date(checkpoint) if checkpoint else None}
+
+
+def open_archive(path: str) -> Optional[np.ndarray]:
+    """Read-only memory-mapped records oldest-first, None if missing or not a valid archive
+
+    Nothing is read until fields are accessed, and pages stay in the OS
+    page cache rather than the process heap. Rewrites replace the file
+    atomically and appends only add records past the mapped length, so an
+    open map keeps seeing the records it was opened with.
+    """
+    header = read_header(path)
+    if header is None:
+        return None
+    count = header['count']
+    if count == 0:
+        return np.zeros(0, dtype=ARCHIVE_DTYPE)
+    return np.memmap(path, dtype=ARCHIVE_DTYPE, mode='r', offset=HEADER_DTYPE.itemsize, shape=(count,))
+
+
+def _iso_date(value: int) -> str:
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+
+def archive_dates(records: np.ndarray) -> List[str]:
+    """ISO dates of the given records"""
+    return [_iso_date(d) for d in records['date'].tolist()]
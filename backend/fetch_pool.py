@@ -0,0 +1,122 @@
+"""
+LottoAI Fetch Pool
+Thread and process pool helpers to run fetches concurrently and hedge fallback sources
+"""
+
+import os
+import time
+import contextvars
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Total time budget for one lottery's jackpot sources (seconds)
+FETCH_DEADLINE = 20
+# Start the next fallback if the current sources have not answered by then
+HEDGE_DELAY = 3
+
+# Worker processes per CPU for run_processes; per-game work is mostly network waits
+PROCESSES_PER_CPU = 4
+
+# A source takes the remaining time budget as its request timeout
+Source = Tuple[str, Callable[[float], Any]]
+
+
+def hedged_first(sources: List[Source],
+                 accept: Callable[[Any], bool],
+                 deadline: float = FETCH_DEADLINE,
+                 hedge_delay: float = HEDGE_DELAY) -> Tuple[Optional[str], Any]:
+    """Return (name, result) of the first source whose result is accepted
+
+    Sources are tried in priority order. The next one is started as soon as
+    an earlier one fails or returns an unaccepted result, or when none has
+    answered within `hedge_delay`. Gives up with (None, None) at `deadline`.
+    """
+    end = time.monotonic() + deadline
+    pending: Dict[Future, str] = {}
+    queue = list(sources)
+    executor = ThreadPoolExecutor(max_workers=max(len(sources), 1))
+
+    def launch():
+        name, fn = queue.pop(0)
+        timeout = max(end - time.monotonic(), 0.1)
+        pending[executor.submit(contextvars.copy_context().run, fn, timeout)] = name
+
+    try:
+        while queue or pending:
+            if not pending and queue:
+                launch()
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = min(hedge_delay, remaining) if queue else remaining
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # Nobody answered in time, hedge with the next source
+                if queue:
+                    launch()
+                continue
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"  {name} error: {e}")
+                    continue
+                if accept(result):
+                    return name, result
+    finally:
+        # Abandoned requests finish in the background within their own timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return None, None
+
+
+def run_parallel(tasks: Dict[str, Callable[[], Any]], max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Run independent tasks concurrently, returns {name: result or exception}
+
+    With `timeout`, tasks still running after that many seconds get a
+    TimeoutError as their result and are left to finish in the background.
+    """
+    results: Dict[str, Any] = {}
+    end = time.monotonic() + timeout if timeout is not None else None
+    executor = ThreadPoolExecutor(max_workers=max_workers or max(len(tasks), 1))
+    try:
+        # Tasks see the caller's context variables, e.g. the lottery metrics attribute requests to
+        futures = {executor.submit(contextvars.copy_context().run, fn): name for name, fn in tasks.items()}
+        for future in futures:
+            name = futures[future]
+            try:
+                results[name] = future.result(timeout=None if end is None else max(end - time.monotonic(), 0))
+            except FutureTimeout:
+                results[name] = TimeoutError(f"{name} did not finish within {timeout}s")
+            except Exception as e:
+                results[name] = e
+    finally:
+        executor.shutdown(wait=end is None, cancel_futures=end is not None)
+    return results
+
+
+def run_processes(fn: Callable[..., Any], args: Dict[str, Tuple], max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Run fn(*args[name]) for each name in a process pool, returns {name: result or exception}
+
+    Workers are spawned rather than forked so they never inherit the
+    parent's open keep-alive connections; `fn` and its arguments must be
+    picklable.
+    """
+    if not args:
+        return {}
+    workers = max_workers or min(len(args), (os.cpu_count() or 1) * PROCESSES_PER_CPU)
+    results: Dict[str, Any] = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {name: executor.submit(fn, *fn_args) for name, fn_args in args.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = e
+    return results
@@ -0,0 +1,200 @@
+"""
+LottoAI Fortunes
+Stateless per-user daily fortunes from a counter-based hash, with a sharded batch writer
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+FORTUNES = [
+    "The stars align in your favor today. Trust your instincts!",
+    "Fortune favors the bold. Take a chance on your dreams!",
+    "Your lucky energy is especially strong today. Good things are coming!",
+    "The universe is sending positive vibrations your way. Stay optimistic!",
+    "Today brings opportunities for unexpected winnings. Keep your eyes open!",
+]
+LUCKY_COLORS = ['Gold', 'Red', 'Blue', 'Green', 'Purple']
+LUCKY_MINUTES = ['00', '15', '30', '45']
+LUCKY_COUNT = 6
+# User id of the site-wide fortune published in daily_fortune.json
+SITE_USER = 'site'
+
+# Hash counters per field; lucky-number candidates use the number itself as their counter
+FORTUNE_COUNTER = 1000
+COLOR_COUNTER = 1001
+HOUR_COUNTER = 1002
+MINUTE_COUNTER = 1003
+MERIDIEM_COUNTER = 1004
+
+# Users hashed per vectorized chunk in the batch writer
+CHUNK_SIZE = 50_000
+DEFAULT_SHARDS = 64
+
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+
+UserId = Union[int, str]
+
+
+def mix64(z: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer over a uint64 array (wrapping arithmetic)"""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def user_key(user_id: UserId) -> int:
+    """64-bit key of a user id; numeric ids (int or digit string) key by value"""
+    text = str(user_id)
+    if text.isdigit():
+        raw = np.array([int(text) & 0xFFFFFFFFFFFFFFFF], dtype=np.uint64)
+    else:
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+        raw = np.array([int.from_bytes(digest, 'little')], dtype=np.uint64)
+    return int(mix64(raw)[0])
+
+
+def user_keys(user_ids: np.ndarray) -> np.ndarray:
+    """Keys for an array of numeric user ids, same as user_key for each"""
+    return mix64(user_ids.astype(np.uint64))
+
+
+def stream_seed(lottery_type: str, date: str) -> np.uint64:
+    """Per-lottery, per-day seed; every user's values for the day derive from it"""
+    digest = hashlib.sha256(f"fortune:{lottery_type}:{date}".encode('utf-8')).digest()
+    return np.uint64(int.from_bytes(digest[:8], 'little'))
+
+
+class FortuneTable:
+    """Fortunes for one lottery and day, computed for any batch of user keys
+
+    Value `c` for a user is mix64(key ^ mix64(seed + c * gamma)): no RNG
+    state is kept, so any user's fortune can be computed alone, in any
+    order, on any worker.
+    """
+
+    def __init__(self, lottery_type: str, date: str, main_range: Tuple[int, int]):
+        self.lottery_type = lottery_type
+        self.date = date
+        self.main_range = main_range
+        seed = stream_seed(lottery_type, date)
+        lo, hi = main_range
+        counters = np.array(list(range(lo, hi + 1)) + [FORTUNE_COUNTER, COLOR_COUNTER, HOUR_COUNTER,
+                                                      MINUTE_COUNTER, MERIDIEM_COUNTER], dtype=np.uint64)
+        self.streams = mix64(seed + counters * GOLDEN_GAMMA)
+        self.candidates = hi - lo + 1
+
+    def compute(self, keys: np.ndarray) -> Dict[str, np.ndarray]:
+        """Field arrays for a batch of user keys: numbers (n, 6) sorted, then indexes per field"""
+        values = mix64(keys[:, None] ^ self.streams[None, :])
+        # Lucky numbers: the six candidates with the smallest hash values
+        order = np.argpartition(values[:, :self.candidates], LUCKY_COUNT, axis=1)[:, :LUCKY_COUNT]
+        fields = values[:, self.candidates:]
+        return {
+            'numbers': np.sort(order, axis=1) + self.main_range[0],
+            'fortune': (fields[:, 0] % np.uint64(len(FORTUNES))).astype(np.int64),
+            'color': (fields[:, 1] % np.uint64(len(LUCKY_COLORS))).astype(np.int64),
+            'hour': (fields[:, 2] % np.uint64(12)).astype(np.int64) + 1,
+            'minute': (fields[:, 3] % np.uint64(len(LUCKY_MINUTES))).astype(np.int64),
+            'pm': (fields[:, 4] & np.uint64(1)).astype(bool),
+        }
+
+    def fortune(self, user_id: UserId) -> Dict:
+        """One user's fortune"""
+        row = {k: v[0] for k, v in self.compute(np.array([user_key(user_id)], dtype=np.uint64)).items()}
+        return {
+            'date': self.date,
+            'fortune': FORTUNES[row['fortune']],
+            'lucky_numbers': row['numbers'].tolist(),
+            'lucky_color': LUCKY_COLORS[row['color']],
+            'lucky_time': f"{row['hour']}:{LUCKY_MINUTES[row['minute']]} {'PM' if row['pm'] else 'AM'}"
+        }
+
+    @staticmethod
+    def _tails() -> List[str]:
+        """Every possible fortune/color/time suffix, indexed by fortune, color, hour, minute, pm"""
+        return [
+            f',"fortune":{json.dumps(fortune)},"lucky_color":{json.dumps(color)},'
+            f'"lucky_time":"{hour}:{minute} {"PM" if pm else "AM"}"}}\n'
+            for fortune in FORTUNES for color in LUCKY_COLORS
+            for hour in range(1, 13) for minute in LUCKY_MINUTES for pm in (False, True)
+        ]
+
+    def lines(self, user_ids: np.ndarray, keys: np.ndarray) -> List[str]:
+        """NDJSON lines for a batch of numeric user ids"""
+        fields = self.compute(keys)
+        # The suffix has few distinct values, so it is looked up instead of formatted per user
+        tail = ((fields['fortune'] * len(LUCKY_COLORS) + fields['color']) * 12 + fields['hour'] - 1)
+        tail = (tail * len(LUCKY_MINUTES) + fields['minute']) * 2 + fields['pm']
+        tails = self._tails()
+        return [
+            f'{{"user_id":{user},"lucky_numbers":[{a},{b},{c},{d},{e},{f}]{tails[t]}'
+            for user, (a, b, c, d, e, f), t in zip(user_ids.tolist(), fields['numbers'].tolist(), tail.tolist())
+        ]
+
+
+def shard_of(keys: np.ndarray, shards: int) -> np.ndarray:
+    """Shard number per user key; clients find a user's file with user_key(id) % shards"""
+    return (keys % np.uint64(shards)).astype(np.int64)
+
+
+def shard_path(out_dir: str, shard: int) -> str:
+    return os.path.join(out_dir, f'{shard:04d}.ndjson.gz')
+
+
+def write_fortune_shards(lottery_type: str, date: str, main_range: Tuple[int, int], users: int,
+                         shards: int, shard_ids: Sequence[int], out_dir: str,
+                         chunk_size: int = CHUNK_SIZE) -> int:
+    """Write the gzip NDJSON shards in `shard_ids` for user ids 0..users-1, returns users written
+
+    Every worker scans all ids (hashing is cheap) and formats only the
+    users that fall in its shards, so workers never share a file.
+    """
+    table = FortuneTable(lottery_type, date, main_range)
+    wanted = np.zeros(shards, dtype=bool)
+    wanted[list(shard_ids)] = True
+    os.makedirs(out_dir, exist_ok=True)
+
+    files = {}
+    written = 0
+    try:
+        for shard in shard_ids:
+            fd, tmp = tempfile.mkstemp(dir=out_dir, prefix='.', suffix='.tmp')
+            raw = os.fdopen(fd, 'wb')
+            files[shard] = (tmp, raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0))
+
+        for start in range(0, users, chunk_size):
+            ids = np.arange(start, min(start + chunk_size, users), dtype=np.int64)
+            keys = user_keys(ids)
+            shard = shard_of(keys, shards)
+            mine = wanted[shard]
+            if not mine.any():
+                continue
+            ids, keys, shard = ids[mine], keys[mine], shard[mine]
+            # Group the chunk by shard, keeping user order within each shard
+            order = np.argsort(shard, kind='stable')
+            lines = table.lines(ids[order], keys[order])
+            bounds = np.cumsum(np.bincount(shard, minlength=shards))
+            for s in np.flatnonzero(np.bincount(shard, minlength=shards)).tolist():
+                begin = bounds[s - 1] if s else 0
+                files[s][2].write(''.join(lines[begin:bounds[s]]).encode('utf-8'))
+            written += len(ids)
+
+        for shard, (tmp, raw, f) in files.items():
+            f.close()
+            raw.close()
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, shard_path(out_dir, shard))
+        files = {}
+    finally:
+        for tmp, raw, f in files.values():
+            f.close()
+            raw.close()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return written
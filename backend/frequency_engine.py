@@ -0,0 +1,111 @@
+"""
+LottoAI Frequency Engine
+Prefix-sum count tables over draw history for multi-window hot/cold analysis
+"""
+
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+Window = Union[int, str]
+
+
+class FrequencyEngine:
+    """Number frequencies for any lookback window in O(range) per window
+
+    History is held newest-first as an (N, 5) main-number matrix and an (N,)
+    special-ball vector. Row w of a prefix table holds the counts over the
+    newest w draws, so every window is a single row lookup.
+    """
+
+    def __init__(self, history: List[Dict], main_range: Tuple[int, int],
+                 special_range: Tuple[int, int]):
+        main = np.array([d['numbers'][:5] for d in history], dtype=np.int16).reshape(-1, 5)
+        special = np.array([d['special'] for d in history], dtype=np.int16)
+        self._index(main, special, main_range, special_range)
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, main_range: Tuple[int, int],
+                     special_range: Tuple[int, int]) -> 'FrequencyEngine':
+        """Engine over oldest-first structured records (e.g. a memory-mapped draw archive)"""
+        engine = cls.__new__(cls)
+        # Reversed views, no copy until the prefix tables are built
+        engine._index(records['numbers'][::-1], records['special'][::-1], main_range, special_range)
+        return engine
+
+    def _index(self, main: np.ndarray, special: np.ndarray, main_range: Tuple[int, int],
+               special_range: Tuple[int, int]):
+        self.main_range = main_range
+        self.special_range = special_range
+        self.size = len(main)
+        self.main = main
+        self.special = special
+
+        main_width = max(main_range[1], int(self.main.max(initial=0))) + 1
+        special_width = max(special_range[1], int(self.special.max(initial=0))) + 1
+        self.main_prefix = self._prefix_counts(self.main, main_width)
+        self.special_prefix = self._prefix_counts(self.special[:, None], special_width)
+
+        # Position of each number's newest appearance, used to break count ties
+        # the same way Counter.most_common does when scanning newest-first
+        self.main_first = self._first_seen(self.main.ravel(), main_width)
+        self.special_first = self._first_seen(self.special, special_width)
+
+    @staticmethod
+    def _prefix_counts(matrix: np.ndarray, width: int) -> np.ndarray:
+        counts = np.zeros((matrix.shape[0] + 1, width), dtype=np.int32)
+        rows = np.repeat(np.arange(1, matrix.shape[0] + 1), matrix.shape[1])
+        np.add.at(counts, (rows, matrix.ravel()), 1)
+        return np.cumsum(counts, axis=0, out=counts)
+
+    @staticmethod
+    def _first_seen(flat: np.ndarray, width: int) -> np.ndarray:
+        first = np.full(width, np.iinfo(np.int64).max, dtype=np.int64)
+        values, index = np.unique(flat, return_index=True)
+        first[values] = index
+        return first
+
+    def _rows(self, windows: Sequence[Window]) -> np.ndarray:
+        return np.array([self.size if w == 'all' else min(int(w), self.size) for w in windows],
+                        dtype=np.intp)
+
+    def counts(self, windows: Sequence[Window]) -> Tuple[np.ndarray, np.ndarray]:
+        """Main and special counts for each window, shapes (W, main) and (W, special)"""
+        rows = self._rows(windows)
+        return self.main_prefix[rows], self.special_prefix[rows]
+
+    def analyze(self, windows: Sequence[Window], hot_count: int = 10,
+                special_hot_count: int = 5) -> Dict[str, Dict]:
+        """Hot/cold numbers and frequencies for several windows in one gather"""
+        main_counts, special_counts = self.counts(windows)
+        main_lo, main_hi = self.main_range
+        special_lo, special_hi = self.special_range
+
+        results = {}
+        for i, window in enumerate(windows):
+            hot_main, cold_main = self._rank(main_counts[i], self.main_first,
+                                             main_lo, main_hi, hot_count)
+            hot_special, cold_special = self._rank(special_counts[i], self.special_first,
+                                                   special_lo, special_hi, special_hot_count)
+            results[str(window)] = {
+                'draws': int(self._rows([window])[0]),
+                'hot_numbers': {'main': hot_main, 'special': hot_special},
+                'cold_numbers': {'main': cold_main, 'special': cold_special},
+                'frequency': {
+                    # Include all numbers that appeared, plus cold numbers with 0
+                    'main': {str(n): int(main_counts[i][n]) for n in hot_main + cold_main},
+                    'special': {str(n): int(special_counts[i][n]) for n in hot_special + cold_special}
+                }
+            }
+        return results
+
+    @staticmethod
+    def _rank(counts: np.ndarray, first: np.ndarray, lo: int, hi: int,
+              top: int) -> Tuple[List[int], List[int]]:
+        seen = np.flatnonzero(counts)
+        # Hot: most common first, ties by newest appearance (Counter.most_common order)
+        hot = seen[np.lexsort((first[seen], -counts[seen]))][:top]
+        # Cold: least common first, ties by number ascending
+        candidates = np.arange(lo, hi + 1)
+        cold = candidates[np.argsort(counts[lo:hi + 1], kind='stable')][:top]
+        return hot.tolist(), cold.tolist()
@@ -0,0 +1,132 @@
+"""
+LottoAI History Export
+Year-sharded history files, delta files and a compact fixed-width binary encoding
+"""
+
+import os
+import glob
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from output_writer import atomic_write, content_hash, write_json
+
+# Number of recent draw dates that get a history_since/{date}.json delta file
+DELTA_DEPTH = 30
+
+# Little-endian fixed-width record: draw date as yyyymmdd, five main numbers, special ball
+RECORD_DTYPE = np.dtype([('date', '<u4'), ('numbers', 'u1', (5,)), ('special', 'u1')])
+
+BINARY_FORMAT = {
+    'record_size': RECORD_DTYPE.itemsize,
+    'byte_order': 'little',
+    'fields': [
+        {'name': 'date', 'type': 'uint32', 'description': 'draw date as yyyymmdd'},
+        {'name': 'numbers', 'type': 'uint8[5]'},
+        {'name': 'special', 'type': 'uint8'},
+    ],
+}
+
+
+def encode_draws(draws: List[Dict]) -> bytes:
+    """Pack draws into fixed-width binary records"""
+    records = np.zeros(len(draws), dtype=RECORD_DTYPE)
+    records['date'] = [int(d['date'].replace('-', '')) for d in draws]
+    records['numbers'] = [d['numbers'][:5] for d in draws]
+    records['special'] = [d['special'] for d in draws]
+    return records.tobytes()
+
+
+def _public_draw(draw: Dict) -> Dict:
+    return {
+        'draw_date': draw['date'],
+        'numbers': draw['numbers'],
+        'special_ball': draw['special'],
+        'jackpot': draw.get('jackpot'),
+        'multiplier': draw.get('multiplier')
+    }
+
+
+def _write_binary(payload: bytes, filepath: str) -> bool:
+    try:
+        with open(filepath, 'rb') as f:
+            if f.read() == payload:
+                return False
+    except OSError:
+        pass
+    atomic_write(filepath, payload)
+    return True
+
+
+def build_history_files(history: List[Dict], delta_depth: int = DELTA_DEPTH
+                        ) -> Tuple[Dict[str, Union[Dict, bytes]], Dict]:
+    """Build year shards and delta files in memory
+
+    Returns ({relative path: JSON payload or binary bytes}, manifest index).
+    Shards hold a calendar year oldest-first as JSON plus a .bin twin. The
+    index gives each JSON shard's content_hash (output_writer.content_hash of
+    its data, not of the served bytes) and the .bin file's bin_sha256, so
+    clients refetch only shards that changed.
+    history_since/{date}.json holds every draw after {date} for the most
+    recent `delta_depth` dates.
+    """
+    ordered = sorted(history, key=lambda d: d['date'])
+    files: Dict[str, Union[Dict, bytes]] = {}
+
+    by_year: Dict[str, List[Dict]] = defaultdict(list)
+    for draw in ordered:
+        by_year[draw['date'][:4]].append(draw)
+
+    shards = {}
+    for year, draws in sorted(by_year.items()):
+        payload = {'year': int(year), 'draws': [_public_draw(d) for d in draws]}
+        binary = encode_draws(draws)
+        files[f'history/{year}.json'] = payload
+        files[f'history/{year}.bin'] = binary
+        shards[year] = {
+            'draws': len(draws),
+            'last_draw_date': draws[-1]['date'],
+            'content_hash': content_hash(payload),
+            'bin_sha256': hashlib.sha256(binary).hexdigest()
+        }
+
+    # Delta files for recent dates (the newest one is empty, telling a client
+    # it is current); clients older than that fall back to changed shards
+    first = max(len(ordered) - delta_depth, 0)
+    since_dates = [d['date'] for d in ordered[first:]]
+    for i in range(first, len(ordered)):
+        files[f"history_since/{ordered[i]['date']}.json"] = {
+            'since': ordered[i]['date'],
+            'draws': [_public_draw(d) for d in ordered[i + 1:]]
+        }
+
+    index = {
+        'draws': len(ordered),
+        'last_draw_date': ordered[-1]['date'] if ordered else None,
+        'shards': shards,
+        'since_dates': since_dates
+    }
+    return files, index
+
+
+def export_history(history: List[Dict], lottery_dir: str, delta_depth: int = DELTA_DEPTH) -> Dict:
+    """Write year shards and delta files, returns the manifest index for them"""
+    files, index = build_history_files(history, delta_depth)
+    since_dir = os.path.join(lottery_dir, 'history_since')
+    os.makedirs(os.path.join(lottery_dir, 'history'), exist_ok=True)
+    os.makedirs(since_dir, exist_ok=True)
+
+    for path, data in files.items():
+        filepath = os.path.join(lottery_dir, *path.split('/'))
+        if isinstance(data, bytes):
+            _write_binary(data, filepath)
+        else:
+            write_json(data, filepath)
+
+    for path in glob.glob(os.path.join(since_dir, '*.json*')):
+        if os.path.basename(path).split('.json')[0] not in index['since_dates']:
+            os.remove(path)
+
+    return index
@@ -0,0 +1,95 @@
+"""
+LottoAI History Ingest
+Paginated, prefetching reader for Socrata datasets with incremental JSON decoding
+"""
+
+import json
+import codecs
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
+
+# Records requested per Socrata page
+PAGE_SIZE = 1000
+# Pages fetched ahead of the one being consumed
+PREFETCH = 2
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array as its bytes arrive
+
+    Only the current partial element is buffered, so a large response is
+    never held (or parsed) as a whole.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+    finished = False
+
+    def elements(final: bool) -> Iterator[Any]:
+        nonlocal buffer, started, finished
+        pos = 0
+        while not finished:
+            # Skip whitespace and separators between elements
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    raise ValueError('Expected a JSON array')
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                finished = True
+                break
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            if end >= len(buffer) and not final:
+                # A scalar could continue in the next chunk, wait for a delimiter
+                break
+            pos = end
+            yield value
+        buffer = buffer[pos:]
+
+    for chunk in chunks:
+        buffer += text.decode(chunk)
+        yield from elements(False)
+        if finished:
+            return
+    buffer += text.decode(b'', final=True)
+    yield from elements(True)
+    if not finished:
+        raise ValueError('Truncated JSON array')
+
+
+def iter_pages(fetch_page: Callable[[int, int], Any], page_size: int = PAGE_SIZE,
+               prefetch: int = PREFETCH, size: Callable[[Any], int] = len) -> Iterator[Any]:
+    """Yield pages from fetch_page(offset, limit) in order, fetching ahead
+
+    The first page is fetched alone so an incremental sync costs a single
+    request; once a page comes back full, up to `prefetch` further pages
+    are kept in flight. Stops after the first page whose `size` (raw
+    record count, before any filtering) is short.
+    """
+    with ThreadPoolExecutor(max_workers=prefetch + 1) as executor:
+        # Page fetches run in copies of the caller's context (e.g. the lottery metrics attribute them to)
+        pending = [executor.submit(contextvars.copy_context().run, fetch_page, 0, page_size)]
+        offset = page_size
+
+        while pending:
+            page = pending.pop(0).result()
+            yield page
+            if size(page) < page_size:
+                for future in pending:
+                    future.cancel()
+                return
+            while len(pending) <= prefetch:
+                pending.append(executor.submit(contextvars.copy_context().run, fetch_page, offset, page_size))
+                offset += page_size
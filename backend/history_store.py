@@ -0,0 +1,137 @@
+"""
+LottoAI History Store
+Persistent SQLite store for draw history with a per-lottery sync checkpoint
+"""
+
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+# Default location of the history database
+HISTORY_DB = os.path.join(os.path.dirname(__file__), 'data', 'history.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS draws (
+    lottery TEXT NOT NULL,
+    draw_date TEXT NOT NULL,
+    numbers TEXT NOT NULL,
+    special INTEGER NOT NULL,
+    jackpot TEXT,
+    multiplier TEXT,
+    PRIMARY KEY (lottery, draw_date)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    lottery TEXT PRIMARY KEY,
+    last_draw_date TEXT,
+    last_synced_at TEXT
+);
+"""
+
+
+class HistoryStore:
+    """Append-only draw history keyed by (lottery, draw_date)"""
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per call keeps the store usable from threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_checkpoint(self, lottery: str) -> Optional[str]:
+        """Return the newest stored draw date (YYYY-MM-DD) for a lottery"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT last_draw_date FROM sync_state WHERE lottery = ?', (lottery,)
+            ).fetchone()
+            if row and row[0]:
+                return row[0]
+            # Checkpoint missing (e.g. older database), derive it from the draws table
+            row = conn.execute(
+                'SELECT MAX(draw_date) FROM draws WHERE lottery = ?', (lottery,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def append(self, lottery: str, draws: List[Dict]) -> int:
+        """Insert new draws and advance the checkpoint, returns rows added"""
+        if not draws:
+            self._touch(lottery)
+            return 0
+
+        rows = [
+            (lottery, d['date'], json.dumps(d['numbers']), d['special'],
+             d.get('jackpot'), d.get('multiplier'))
+            for d in draws
+        ]
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO draws '
+                '(lottery, draw_date, numbers, special, jackpot, multiplier) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            added = conn.total_changes - before
+            self._update_checkpoint(conn, lottery, max(d['date'] for d in draws))
+        return added
+
+    def load(self, lottery: str, limit: Optional[int] = None, since: Optional[str] = None) -> List[Dict]:
+        """Load stored draws (only those after `since` if given), newest first"""
+        query = 'SELECT draw_date, numbers, special, jackpot, multiplier FROM draws WHERE lottery = ?'
+        params: tuple = (lottery,)
+        if since:
+            query += ' AND draw_date > ?'
+            params += (since,)
+        query += ' ORDER BY draw_date DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params += (limit,)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        return [
+            {
+                'date': draw_date,
+                'numbers': json.loads(numbers),
+                'special': special,
+                'jackpot': jackpot,
+                'multiplier': multiplier
+            }
+            for draw_date, numbers, special, jackpot, multiplier in rows
+        ]
+
+    def count(self, lottery: str) -> int:
+        """Number of stored draws for a lottery"""
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT COUNT(*) FROM draws WHERE lottery = ?', (lottery,)
+            ).fetchone()[0]
+
+    def _touch(self, lottery: str):
+        """Record a sync attempt that produced no new draws"""
+        with self._connect() as conn:
+            self._update_checkpoint(conn, lottery, None)
+
+    @staticmethod
+    def _update_checkpoint(conn: sqlite3.Connection, lottery: str, draw_date: Optional[str]):
+        conn.execute(
+            'INSERT INTO sync_state (lottery, last_draw_date, last_synced_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(lottery) DO UPDATE SET '
+            'last_draw_date = NULLIF(MAX(COALESCE(sync_state.last_draw_date, \'\'), '
+            'COALESCE(excluded.last_draw_date, \'\')), \'\'), '
+            'last_synced_at = excluded.last_synced_at',
+            (lottery, draw_date, datetime.now().isoformat())
+        )
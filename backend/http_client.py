@@ -0,0 +1,215 @@
+"""
+LottoAI HTTP Client
+Shared pooled session with retries and an on-disk conditional-GET cache
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Cached responses not fetched or revalidated for this long are evicted, so entries
+# keyed by a since-checkpoint filter don't pile up once the checkpoint moves on
+CACHE_MAX_AGE = 7 * 24 * 3600
+
+# Responses retried like connection errors and timeouts
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Called with {url, status, bytes, seconds, error} after every request
+Observer = Callable[[Dict], None]
+
+
+class HttpClient:
+    """Keep-alive session that revalidates cached responses with ETag/Last-Modified"""
+
+    def __init__(self, headers: Optional[Dict] = None, cache_dir: Optional[str] = None,
+                 retries: int = 2, backoff: float = 0.5, pool_size: int = 10):
+        self.cache_dir = None
+        self.use_cache_dir(cache_dir)
+        self.retries = retries
+        self.backoff = backoff
+
+        # One session for all threads: urllib3's pool is thread-safe and keeps
+        # connections alive across the short-lived fetch worker threads
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        # Retries happen in get(), where they can be held to a time budget
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.observers: List[Observer] = []
+
+    def use_cache_dir(self, cache_dir: Optional[str]):
+        """Keep cached responses in cache_dir from now on (None turns the cache off)"""
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        if cache_dir != self.cache_dir:
+            self.cache_dir = cache_dir
+            self._pruned = False
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout: float = 15,
+            headers: Optional[Dict] = None, stream: bool = False,
+            budget: Optional[float] = None) -> requests.Response:
+        """Plain pooled GET, retrying connection errors, timeouts and RETRY_STATUSES with backoff
+
+        With `budget`, the whole call including retries and backoff ends
+        within that many seconds: each attempt's timeout is cut to the time
+        left, and no retry starts once it is used up. Observers are
+        notified here unless `stream` is set, in which case the caller
+        reads the body and notifies (see get_cached).
+        """
+        started = time.perf_counter()
+        end = time.monotonic() + budget if budget is not None else None
+        attempt = 0
+        while True:
+            left = timeout if end is None else min(timeout, end - time.monotonic())
+            try:
+                if left <= 0:
+                    raise requests.Timeout(f"No time left for {url}")
+                response = self.session.get(url, params=params, headers=headers, timeout=left, stream=stream)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            if error is None and response.status_code not in RETRY_STATUSES:
+                break
+
+            delay = self.backoff * 2 ** attempt
+            if attempt >= self.retries or (end is not None and time.monotonic() + delay >= end):
+                break
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+        if error is not None:
+            self._notify(url, None, started, error=str(error))
+            raise error
+        if not stream:
+            self._notify(response.url, response, started)
+        return response
+
+    def get_cached(self, url: str, parse: Callable[[requests.Response], Any],
+                   params: Optional[Dict] = None, timeout: float = 15, stream: bool = False,
+                   budget: Optional[float] = None) -> Any:
+        """GET and parse a resource, revalidating against the on-disk cache
+
+        On 304 Not Modified the previously parsed value is returned, so
+        neither the body nor the parse step is repeated. Non-2xx responses
+        raise requests.HTTPError. With `stream`, parse reads the body itself
+        (e.g. via iter_content) instead of it being downloaded up front.
+        `budget` bounds the request and its retries, see get.
+        """
+        key = self._cache_key(url, params, parse)
+        entry = self._load(key)
+
+        conditional = {}
+        if entry:
+            if entry.get('etag'):
+                conditional['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                conditional['If-Modified-Since'] = entry['last_modified']
+
+        started = time.perf_counter()
+        response = self.get(url, params=params, timeout=timeout, headers=conditional, stream=stream,
+                            budget=budget)
+        try:
+            with response:
+                if response.status_code == 304 and entry:
+                    self._touch(key)
+                    return entry['value']
+
+                response.raise_for_status()
+                value = parse(response)
+        finally:
+            if stream:
+                # Counts only what parse actually read, e.g. up to an early exit
+                self._notify(response.url, response, started)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self._save(key, {
+                'url': response.url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': datetime.now().isoformat(),
+                'value': value
+            })
+        return value
+
+    def _notify(self, url: str, response: Optional[requests.Response], started: float,
+                error: Optional[str] = None):
+        if not self.observers:
+            return
+        event = {
+            'url': url,
+            'status': response.status_code if response is not None else None,
+            # Bytes read off the wire (before content decoding)
+            'bytes': response.raw.tell() if response is not None and hasattr(response.raw, 'tell') else 0,
+            'seconds': round(time.perf_counter() - started, 6),
+            'error': error
+        }
+        for observer in self.observers:
+            observer(event)
+
+    @staticmethod
+    def _cache_key(url: str, params: Optional[Dict], parse: Callable) -> str:
+        # The parser is part of the key since the cache stores its output, not the body
+        raw = json.dumps([url, sorted((params or {}).items()), getattr(parse, '__qualname__', '')],
+                         default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _load(self, key: str) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, f'{key}.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _touch(self, key: str):
+        # A revalidated entry is still in use, so it restarts its CACHE_MAX_AGE
+        try:
+            os.utime(os.path.join(self.cache_dir, f'{key}.json'))
+        except OSError:
+            pass
+
+    def prune(self, max_age: float = CACHE_MAX_AGE) -> int:
+        """Delete cache entries untouched for `max_age` seconds, returns how many"""
+        if not self.cache_dir:
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if name.endswith(('.json', '.tmp')) and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _save(self, key: str, entry: Dict):
+        if not self.cache_dir:
+            return
+        if not self._pruned:
+            # Once per client, so stale entries go without a scan on every save
+            self._pruned = True
+            self.prune()
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, os.path.join(self.cache_dir, f'{key}.json'))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"  HTTP cache write error: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
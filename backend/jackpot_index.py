@@ -0,0 +1,107 @@
+"""
+LottoAI Jackpot Index
+Jackpot amounts keyed by canonical draw date, parsed into integer dollars
+"""
+
+import re
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Optional
+
+# Draws happen late evening US Eastern; epoch timestamps are read in this offset
+DRAW_TZ = timezone(timedelta(hours=-5))
+
+# Date layouts seen across the official APIs and scraped pages, beyond ISO and m/d/Y
+DATE_FORMATS = ('%a, %b %d, %Y', '%A, %B %d, %Y', '%B %d, %Y', '%b %d, %Y', '%m/%d/%y')
+
+AMOUNT_RE = re.compile(r'\$?\s*(\d[\d,]*(?:\.\d+)?)\s*(billion|million|thousand|[bmk])?\b', re.IGNORECASE)
+UNITS = {'thousand': 10 ** 3, 'k': 10 ** 3, 'million': 10 ** 6, 'm': 10 ** 6, 'billion': 10 ** 9, 'b': 10 ** 9}
+
+
+def normalize_date(value: Any) -> Optional[str]:
+    """Canonical YYYY-MM-DD for a draw date in any known format, None if unparseable
+
+    Handles ISO dates and datetimes (Socrata), m/d/Y, .NET `/Date(ms)/`
+    values (Mega Millions) and spelled-out dates from scraped pages.
+    """
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, date):
+        return value.isoformat()
+    if not value or not isinstance(value, str):
+        return None
+    text = value.strip()
+
+    match = re.match(r'/Date\((-?\d+)', text)
+    if match:
+        return datetime.fromtimestamp(int(match.group(1)) / 1000, DRAW_TZ).strftime('%Y-%m-%d')
+
+    match = re.match(r'(\d{4})-(\d{1,2})-(\d{1,2})', text) or re.match(r'(\d{1,2})/(\d{1,2})/(\d{4})\b', text)
+    if match:
+        parts = [int(p) for p in match.groups()]
+        year, month, day = parts if parts[0] > 31 else (parts[2], parts[0], parts[1])
+        try:
+            return date(year, month, day).isoformat()
+        except ValueError:
+            return None
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def parse_amount(value: Any) -> Optional[int]:
+    """Jackpot in whole dollars from "$83.2 Million", "$1.5B", "$450,000" or a number"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(value)) if value > 0 else None
+
+    match = AMOUNT_RE.search(str(value))
+    if not match:
+        return None
+    try:
+        amount = Decimal(match.group(1).replace(',', ''))
+    except InvalidOperation:
+        return None
+    unit = UNITS.get((match.group(2) or '').lower(), 1)
+    dollars = int(amount * unit)
+    return dollars or None
+
+
+class JackpotIndex:
+    """Jackpot per canonical draw date with O(1) lookup"""
+
+    def __init__(self):
+        self.entries: Dict[str, Dict] = {}
+
+    def add(self, draw_date: Any, jackpot: Any) -> bool:
+        """Record a jackpot for a draw, returns False if date or amount is unusable"""
+        key = normalize_date(draw_date)
+        amount = parse_amount(jackpot)
+        if not key or amount is None:
+            return False
+        self.entries[key] = {'amount': amount, 'display': jackpot if isinstance(jackpot, str) else None}
+        return True
+
+    def add_results(self, results: Iterable[Dict], date_field: str = 'date', jackpot_field: str = 'jackpot') -> int:
+        """Index a list of result dicts, later entries win, returns entries added"""
+        return sum(self.add(r.get(date_field), r.get(jackpot_field)) for r in results)
+
+    def get(self, draw_date: Any) -> Optional[Dict]:
+        """Entry for a draw date in any supported format"""
+        key = normalize_date(draw_date)
+        return self.entries.get(key) if key else None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def series(self) -> List[Dict]:
+        """Time series oldest first"""
+        return [
+            {'draw_date': key, 'amount': entry['amount'], 'display': entry['display']}
+            for key, entry in sorted(self.entries.items())
+        ]
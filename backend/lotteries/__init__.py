@@ -0,0 +1,20 @@
+"""
+LottoAI Lottery Plugins
+Each module here registers one or more games when imported, for example:
+
+    from lottery_registry import register_lottery
+
+    register_lottery('cash4life', {
+        'name': 'Cash4Life',
+        'main_range': (1, 60),
+        'special_name': 'Cash Ball',
+        'special_range': (1, 4),
+        'draw_days': ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+        'api_url': 'https://data.ny.gov/resource/kwxv-fwze.json',
+        'special_field': 'cash_ball',
+        'jackpot_sources': [('lottery.net', 'lottery.net', 'cash4life')],
+    })
+
+Games with a non-Socrata feed pass their own `parse_record(item, config)`
+returning (draw date, main numbers, special ball).
+"""
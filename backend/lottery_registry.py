@@ -0,0 +1,140 @@
+"""
+LottoAI Lottery Registry
+Games declare their ranges, draw days, data sources and record parser here
+"""
+
+import os
+import importlib
+from typing import Dict, List, Tuple
+
+# Registered games by lottery type, in registration order
+LOTTERY_CONFIG: Dict[str, Dict] = {}
+
+# Plugin modules in this package call register_lottery when imported
+PLUGIN_PACKAGE = 'lotteries'
+PLUGIN_DIR = os.path.join(os.path.dirname(__file__), PLUGIN_PACKAGE)
+
+REQUIRED_FIELDS = ('name', 'main_range', 'special_name', 'special_range', 'draw_days', 'api_url')
+
+# Parsed record: (draw date, main numbers, special ball)
+ParsedRecord = Tuple[str, List[int], int]
+
+
+def socrata_record(item: Dict, config: Dict) -> ParsedRecord:
+    """Default record parser for Socrata draw datasets
+
+    Main numbers come from `numbers_field` (space separated). The special
+    ball is the next number in that field, or `special_field` if declared.
+    Raises ValueError, IndexError or KeyError for malformed records.
+    """
+    parts = item.get(config['numbers_field'], '').split()
+    numbers = [int(parts[i]) for i in range(config['main_count'])]
+    if config['special_field']:
+        special = int(item.get(config['special_field'], 0))
+    else:
+        special = int(parts[config['main_count']]) if len(parts) > config['main_count'] else 0
+    return item.get(config['date_field'], '')[:10], numbers, special
+
+
+DEFAULTS = {
+    'main_count': 5,
+    'date_field': 'draw_date',
+    'numbers_field': 'winning_numbers',
+    'special_field': None,
+    'parse_record': socrata_record,
+    # (label, kind, argument) in priority order, reordered by source health, see JackpotScraper.fetch_jackpot
+    'jackpot_sources': [],
+    # Optional (kind, argument) source of recent results with jackpots
+    'recent_results_source': None,
+    'prize_tiers': [],
+}
+
+
+def register_lottery(lottery_type: str, config: Dict) -> Dict:
+    """Validate a game's config, fill in defaults and add it to LOTTERY_CONFIG"""
+    missing = [field for field in REQUIRED_FIELDS if field not in config]
+    if missing:
+        raise ValueError(f"Lottery {lottery_type} is missing {', '.join(missing)}")
+    config = {**DEFAULTS, **config}
+    # Analysis, tickets and binary exports assume five main numbers plus one special ball
+    if config['main_count'] != 5:
+        raise ValueError(f"Lottery {lottery_type}: only 5 main numbers plus a special ball are supported")
+    if lottery_type in LOTTERY_CONFIG:
+        raise ValueError(f"Lottery {lottery_type} is already registered")
+    LOTTERY_CONFIG[lottery_type] = config
+    return config
+
+
+def load_plugins(directory: str = PLUGIN_DIR, package: str = PLUGIN_PACKAGE) -> List[str]:
+    """Import every plugin module in `directory`, returns the module names"""
+    if not os.path.isdir(directory):
+        return []
+    loaded = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.py') and not filename.startswith('_'):
+            module = f'{package}.{filename[:-3]}'
+            importlib.import_module(module)
+            loaded.append(module)
+    return loaded
+
+
+def lottery_types() -> List[str]:
+    """Registered lottery types in registration order"""
+    return list(LOTTERY_CONFIG)
+
+
+# Built-in games
+register_lottery('powerball', {
+    'name': 'Powerball',
+    'main_count': 5,
+    'main_range': (1, 69),
+    'special_name': 'Powerball',
+    'special_range': (1, 26),
+    'draw_days': ['Monday', 'Wednesday', 'Saturday'],
+    'api_url': 'https://data.ny.gov/resource/d6yy-54nr.json',
+    'jackpot_sources': [
+        ('Powerball API', 'powerball_api', None),
+        ('lottery.net', 'lottery.net', 'powerball'),
+        ('powerball.com homepage', 'homepage', 'https://www.powerball.com/'),
+    ],
+    'recent_results_source': ('powerball_recent', None),
+    # (main matches, special matched, tier name)
+    'prize_tiers': [
+        (5, 1, 'Jackpot'),
+        (5, 0, 'Match 5'),
+        (4, 1, 'Match 4 + Powerball'),
+        (4, 0, 'Match 4'),
+        (3, 1, 'Match 3 + Powerball'),
+        (3, 0, 'Match 3'),
+        (2, 1, 'Match 2 + Powerball'),
+        (1, 1, 'Match 1 + Powerball'),
+        (0, 1, 'Powerball only'),
+    ],
+})
+
+register_lottery('mega_millions', {
+    'name': 'Mega Millions',
+    'main_count': 5,
+    'main_range': (1, 70),
+    'special_name': 'Mega Ball',
+    'special_range': (1, 25),
+    'draw_days': ['Tuesday', 'Friday'],
+    'api_url': 'https://data.ny.gov/resource/5xaw-6ayf.json',
+    'special_field': 'mega_ball',
+    'jackpot_sources': [
+        ('Mega Millions API', 'mega_millions_api', None),
+        ('lottery.net', 'lottery.net', 'mega-millions'),
+        ('megamillions.com homepage', 'homepage', 'https://www.megamillions.com/'),
+    ],
+    'prize_tiers': [
+        (5, 1, 'Jackpot'),
+        (5, 0, 'Match 5'),
+        (4, 1, 'Match 4 + Mega Ball'),
+        (4, 0, 'Match 4'),
+        (3, 1, 'Match 3 + Mega Ball'),
+        (3, 0, 'Match 3'),
+        (2, 1, 'Match 2 + Mega Ball'),
+        (1, 1, 'Match 1 + Mega Ball'),
+        (0, 1, 'Mega Ball only'),
+    ],
+})
@@ -7,47 +7,73 @@ Usage:
     python lottery_service.py --lottery powerball
     python lottery_service.py --lottery mega_millions
     python lottery_service.py --all
+    python lottery_service.py --all --backtest
+    python lottery_service.py --lottery powerball --bulk 10000 --segment vip
+    python lottery_service.py --lottery powerball --wheel 3,7,12,19,23,31,38,44,52,61 --guarantee 3 --if-drawn 4
+    python lottery_service.py --all --serve --port 8080
 """
 
 import os
+import sys
 import json
 import random
 import requests
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 import argparse
+import asyncio
+import numpy as np
+
+from api_server import REFRESH_INTERVAL, ApiServer
+from backtest import generate_tickets, run_backtest
+from bulk_predictions import BULK_STRATEGIES, BulkSampler, request_seed, write_ndjson
+from co_occurrence import CoOccurrenceIndex
+from combo_rank import ComboIndex, ComboSet, dedupe
+from draw_archive import append_archive, archive_path, open_archive, read_header, write_archive
+from fetch_pool import FETCH_DEADLINE, Source, hedged_first, run_parallel, run_processes
+from frequency_engine import FrequencyEngine, Window
+from fortunes import DEFAULT_SHARDS, SITE_USER, FortuneTable, UserId, shard_path, write_fortune_shards
+from history_export import BINARY_FORMAT, build_history_files, export_history
+from history_ingest import iter_json_array, iter_pages
+from history_store import HistoryStore, HISTORY_DB
+from http_client import HttpClient
+from jackpot_index import JackpotIndex, normalize_date, parse_amount
+from lottery_registry import LOTTERY_CONFIG, load_plugins, lottery_types
+from output_writer import write_json
+from pipeline import Pipeline, Stage
+from refresh_planner import RefreshPlan, load_state, next_draw_date, plan_refresh, save_state
+from run_metrics import RunMetrics
+from scrape_engine import Field, ScrapeSpec, iter_text
+from source_health import SourceHealth
+from stats_cache import StatsCache, history_fingerprint
+from ticket_checker import TicketChecker, check_ticket_file
+from wheel import MAIN_COUNT, MAX_POOL, WheelCache, apply_wheel, find_wheel, lower_bound, precompute_wheels
 
 # Output directory for JSON files
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'public')
 
-# Lottery configurations
-LOTTERY_CONFIG = {
-    'powerball': {
-        'name': 'Powerball',
-        'main_count': 5,
-        'main_range': (1, 69),
-        'special_name': 'Powerball',
-        'special_range': (1, 26),
-        'draw_days': ['Monday', 'Wednesday', 'Saturday'],
-        'api_url': 'https://data.ny.gov/resource/d6yy-54nr.json',
-        'jackpot_url': 'https://www.powerball.com/api/v1/estimates/powerball?_format=json',
-        'results_url': 'https://www.powerball.com/api/v1/numbers/powerball/recent?_format=json',
-    },
-    'mega_millions': {
-        'name': 'Mega Millions',
-        'main_count': 5,
-        'main_range': (1, 70),
-        'special_name': 'Mega Ball',
-        'special_range': (1, 25),
-        'draw_days': ['Tuesday', 'Friday'],
-        'api_url': 'https://data.ny.gov/resource/5xaw-6ayf.json',
-        'jackpot_url': 'https://www.megamillions.com/cmspages/utilservice.asmx/GetLatestDrawData',
-        'results_url': 'https://www.megamillions.com/cmspages/utilservice.asmx/GetLatestDrawData',
-    }
+# Games beyond the built-in ones register from lotteries/
+load_plugins()
+
+# Lookback windows published in hot_cold_numbers.json
+HOT_COLD_WINDOWS = [10, 25, 50, 100, 'all']
+
+# Output file written by each file stage of the lottery pipeline
+OUTPUT_FILES = {
+    'latest_results': 'latest_results.json',
+    'hot_cold': 'hot_cold_numbers.json',
+    'co_occurrence': 'co_occurrence.json',
+    'predictions': 'ai_predictions.json',
+    'fortune': 'daily_fortune.json',
+    'jackpot': 'jackpot.json',
+    'jackpot_history': 'jackpot_history.json',
+    'wheel': 'wheel.json',
 }
 
+# Wheel published in wheel.json: hot pool size, guaranteed matches, if that many pool numbers are drawn
+DEFAULT_WHEEL = (10, 3, 3)
+
 # Prediction strategies
 STRATEGIES = [
     {'id': 'frequency', 'name': 'Frequency Analysis', 'description': 'Based on most common numbers'},
@@ -64,13 +90,103 @@ HEADERS = {
     'Accept-Language': 'en-US,en;q=0.9',
 }
 
+# Shared keep-alive client; sends HEADERS and revalidates responses cached next to the history store
+http = HttpClient(headers=HEADERS)
+
+# Stage timings and request stats for this process, written as run_metrics.json
+metrics = RunMetrics()
+http.observers.append(metrics.record_request)
+
+# Jackpot amount like "$1.2 Billion" or "$450,000,000 Million"
+JACKPOT_AMOUNT = r'\$[\d,]+(?:\.\d+)?\s*(?:Million|Billion)'
+
+# Scrape specs for HTML sources; patterns are in priority order and scanned in one pass
+LOTTERY_NET_SPEC = ScrapeSpec([
+    Field('jackpot', [
+        rf'jackpot[^$]{{0,400}}(?P<value>{JACKPOT_AMOUNT})',
+        rf'(?P<value>{JACKPOT_AMOUNT})\s*(?:jackpot|estimated)',
+        rf'Est(?:imated)?[^$]{{0,400}}(?P<value>{JACKPOT_AMOUNT})',
+        rf'>(?P<value>{JACKPOT_AMOUNT})<',
+        r'(?P<value>\$\d+(?:\.\d+)?\s*(?:Million|Billion))',
+    ]),
+    Field('recent_numbers',
+          [r'(?P<value>\d{1,2}\s*,\s*\d{1,2}\s*,\s*\d{1,2}\s*,\s*\d{1,2}\s*,\s*\d{1,2})'],
+          limit=5, convert=lambda value: [int(n) for n in re.findall(r'\d+', value)]),
+])
+HOMEPAGE_SPEC = ScrapeSpec([
+    Field('jackpot', [r'(?P<value>\$\d+(?:\.\d+)?\s*(?:Million|Billion))']),
+])
+USAMEGA_SPEC = ScrapeSpec([
+    Field('jackpot', [r'Est\.\s*Jackpot[:\s]{0,20}\$?(?P<value>[\d,]+)'],
+          convert=lambda value: value.replace(',', '')),
+])
+
 
 class JackpotScraper:
     """Scraper for lottery jackpot information from official websites"""
 
     @staticmethod
-    def fetch_powerball_jackpot() -> Dict:
-        """Fetch current Powerball jackpot and recent results"""
+    def fetch_jackpot(config: Dict, deadline: float = FETCH_DEADLINE,
+                      health: Optional[SourceHealth] = None) -> Dict:
+        """Fetch a game's current jackpot and recent results from its declared sources
+
+        The recent-results source runs alongside a hedged race of the
+        jackpot sources, all within `deadline`. With `health`, every
+        outcome is recorded and the race runs in health order, leaving
+        out sources whose circuit is open.
+        """
+        def has_jackpot(result: Dict) -> bool:
+            return bool(result.get('current_jackpot'))
+
+        sources = [(label, JackpotScraper._source(kind, arg))
+                   for label, kind, arg in config['jackpot_sources']]
+        recent = config['recent_results_source']
+        recent_fetcher = JackpotScraper._source(*recent) if recent else None
+
+        if health:
+            keys = [JackpotScraper.source_key(kind, arg) for _, kind, arg in config['jackpot_sources']]
+            sources = [(label, health.track(key, fn, has_jackpot)) for (label, fn), key in zip(sources, keys)]
+            sources, skipped = health.order(sources, keys)
+            for key in skipped:
+                print(f"  Skipping {key}: circuit open")
+            if recent_fetcher:
+                key = JackpotScraper.source_key(*recent)
+                if health.is_open(health.get(key)):
+                    print(f"  Skipping {key}: circuit open")
+                    recent_fetcher = None
+                else:
+                    recent_fetcher = health.track(key, recent_fetcher)
+        return JackpotScraper._race_jackpot_sources(sources, recent_fetcher, deadline, has_jackpot)
+
+    @staticmethod
+    def source_key(kind: str, arg: Optional[str]) -> str:
+        """Health record key for a declared source, shared by games using the same endpoint"""
+        return f"{kind}:{arg}" if arg else kind
+
+    @staticmethod
+    def _source(kind: str, arg: Optional[str]) -> Callable[[float], object]:
+        """Fetcher taking a timeout for a declared (kind, argument) source"""
+        fetchers = {
+            'powerball_api': JackpotScraper._fetch_powerball_estimates,
+            'powerball_recent': JackpotScraper._fetch_powerball_recent,
+            'mega_millions_api': JackpotScraper._fetch_mega_millions_api,
+            'lottery.net': lambda timeout: JackpotScraper._scrape_lottery_net(arg, timeout),
+            'usamega': lambda timeout: JackpotScraper._scrape_usamega(arg, timeout),
+            'homepage': lambda timeout: JackpotScraper._scrape_homepage(arg, timeout),
+        }
+        if kind not in fetchers:
+            raise ValueError(f"Unknown jackpot source kind: {kind}")
+        return fetchers[kind]
+
+    @staticmethod
+    def _race_jackpot_sources(sources: List[Source],
+                              recent_fetcher: Optional[Callable[[float], List[Dict]]],
+                              deadline: float, accept: Callable[[Dict], bool]) -> Dict:
+        """Run the jackpot sources hedged and the recent-results fetch in parallel, within `deadline`
+
+        Source fetchers take the time left as their budget for the request
+        and any retries (see HttpClient.get).
+        """
         jackpot_info = {
             'current_jackpot': None,
             'cash_option': None,
@@ -78,227 +194,239 @@ class JackpotScraper:
             'recent_results': []
         }
 
-        try:
-            # Try official Powerball API
-            response = requests.get(
-                'https://www.powerball.com/api/v1/estimates/powerball?_format=json',
-                headers=HEADERS,
-                timeout=15
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    jackpot_info['current_jackpot'] = data.get('jackpot', {}).get('amount')
-                    jackpot_info['cash_option'] = data.get('jackpot', {}).get('cash')
-                    jackpot_info['next_draw_date'] = data.get('next_draw_date')
-        except Exception as e:
-            print(f"Powerball API error: {e}")
+        tasks = {
+            'jackpot': lambda: hedged_first(sources, accept, deadline)
+        }
+        if recent_fetcher:
+            tasks['recent'] = lambda: recent_fetcher(deadline)
+        # Every fetch is budgeted to the deadline, so this only cuts off slow parsing
+        results = run_parallel(tasks, timeout=deadline)
+
+        source, winner = results['jackpot'] if not isinstance(results['jackpot'], Exception) else (None, None)
+        metrics.record_source('jackpot', source if winner else None)
+        if winner:
+            print(f"  Jackpot source: {source}")
+            jackpot_info.update({k: v for k, v in winner.items() if v})
+        else:
+            print("  All jackpot sources failed")
 
-        # Try fetching recent results with jackpots
-        try:
-            response = requests.get(
-                'https://www.powerball.com/api/v1/numbers/powerball/recent?_format=json',
-                headers=HEADERS,
-                timeout=15
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list):
-                    for draw in data[:10]:
-                        result = {
-                            'date': draw.get('draw_date', ''),
-                            'numbers': [],
-                            'powerball': None,
-                            'jackpot': None,
-                            'multiplier': draw.get('multiplier')
-                        }
-
-                        # Parse numbers
-                        if 'winning_numbers' in draw:
-                            nums = draw['winning_numbers'].split()
-                            if len(nums) >= 6:
-                                result['numbers'] = [int(n) for n in nums[:5]]
-                                result['powerball'] = int(nums[5])
-
-                        # Get jackpot
-                        if 'jackpot' in draw:
-                            result['jackpot'] = draw['jackpot']
-
-                        jackpot_info['recent_results'].append(result)
-        except Exception as e:
-            print(f"Powerball results API error: {e}")
-
-        # Fallback 1: scrape from lottery.net
-        if not jackpot_info['current_jackpot']:
-            print("  Powerball API failed, trying lottery.net...")
-            jackpot_info.update(JackpotScraper._scrape_lottery_net('powerball'))
-
-        # Fallback 2: scrape from powerball.com homepage
-        if not jackpot_info['current_jackpot']:
-            print("  lottery.net failed, trying powerball.com homepage...")
-            try:
-                response = requests.get('https://www.powerball.com/', headers=HEADERS, timeout=15)
-                if response.status_code == 200:
-                    html = response.text
-                    # Look for jackpot in page
-                    match = re.search(r'(\$\d+(?:\.\d+)?\s*(?:Million|Billion))', html, re.IGNORECASE)
-                    if match:
-                        jackpot_info['current_jackpot'] = match.group(1)
-                        print(f"  Found jackpot from homepage: {jackpot_info['current_jackpot']}")
-            except Exception as e:
-                print(f"  powerball.com homepage error: {e}")
+        recent = results.get('recent')
+        if isinstance(recent, Exception):
+            print(f"  Recent results error: {recent}")
+        elif recent:
+            jackpot_info['recent_results'] = recent
 
         return jackpot_info
 
     @staticmethod
-    def fetch_mega_millions_jackpot() -> Dict:
-        """Fetch current Mega Millions jackpot and recent results"""
+    def _fetch_powerball_estimates(timeout: float = 15) -> Dict:
+        """Current jackpot from the official Powerball estimates API"""
+        return http.get_cached(
+            'https://www.powerball.com/api/v1/estimates/powerball?_format=json',
+            JackpotScraper._parse_powerball_estimates,
+            timeout=timeout,
+            budget=timeout
+        )
+
+    @staticmethod
+    def _parse_powerball_estimates(response: requests.Response) -> Dict:
+        result = {'current_jackpot': None, 'cash_option': None, 'next_draw_date': None}
+        data = response.json()
+        if data:
+            result['current_jackpot'] = data.get('jackpot', {}).get('amount')
+            result['cash_option'] = data.get('jackpot', {}).get('cash')
+            result['next_draw_date'] = data.get('next_draw_date')
+        return result
+
+    @staticmethod
+    def _fetch_powerball_recent(timeout: float = 15) -> List[Dict]:
+        """Recent Powerball results with jackpots from the official API"""
+        return http.get_cached(
+            'https://www.powerball.com/api/v1/numbers/powerball/recent?_format=json',
+            JackpotScraper._parse_powerball_recent,
+            timeout=timeout,
+            budget=timeout
+        )
+
+    @staticmethod
+    def _parse_powerball_recent(response: requests.Response) -> List[Dict]:
+        recent_results = []
+        data = response.json()
+        if isinstance(data, list):
+            for draw in data[:10]:
+                result = {
+                    'date': draw.get('draw_date', ''),
+                    'numbers': [],
+                    'powerball': None,
+                    'jackpot': None,
+                    'multiplier': draw.get('multiplier')
+                }
+
+                # Parse numbers
+                if 'winning_numbers' in draw:
+                    nums = draw['winning_numbers'].split()
+                    if len(nums) >= 6:
+                        result['numbers'] = [int(n) for n in nums[:5]]
+                        result['powerball'] = int(nums[5])
+
+                # Get jackpot
+                if 'jackpot' in draw:
+                    result['jackpot'] = draw['jackpot']
+
+                recent_results.append(result)
+        return recent_results
+
+    @staticmethod
+    def _fetch_mega_millions_api(timeout: float = 15) -> Dict:
+        """Current jackpot and latest drawing from the Mega Millions API"""
+        return http.get_cached(
+            'https://www.megamillions.com/cmspages/utilservice.asmx/GetLatestDrawData',
+            JackpotScraper._parse_mega_millions_api,
+            timeout=timeout,
+            budget=timeout
+        )
+
+    @staticmethod
+    def _parse_mega_millions_api(response: requests.Response) -> Dict:
         jackpot_info = {
             'current_jackpot': None,
             'cash_option': None,
             'next_draw_date': None,
             'recent_results': []
         }
+        data = response.json()
+        if 'Jackpot' in data:
+            jackpot_info['current_jackpot'] = data.get('Jackpot', {}).get('CurrentJackpot')
+            jackpot_info['cash_option'] = data.get('Jackpot', {}).get('CurrentCashValue')
+            jackpot_info['next_draw_date'] = data.get('Jackpot', {}).get('NextDrawDate')
+
+        # Get winning numbers
+        if 'Drawing' in data:
+            result = {
+                'date': data['Drawing'].get('DrawDate'),
+                'numbers': data['Drawing'].get('WinningNumbers', []),
+                'megaball': data['Drawing'].get('MegaBall'),
+                'megaplier': data['Drawing'].get('Megaplier'),
+                'jackpot': data['Drawing'].get('Jackpot')
+            }
+            jackpot_info['recent_results'].append(result)
+        return jackpot_info
 
-        try:
-            # Try Mega Millions API
-            response = requests.get(
-                'https://www.megamillions.com/cmspages/utilservice.asmx/GetLatestDrawData',
-                headers=HEADERS,
-                timeout=15
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if 'Jackpot' in data:
-                    jackpot_info['current_jackpot'] = data.get('Jackpot', {}).get('CurrentJackpot')
-                    jackpot_info['cash_option'] = data.get('Jackpot', {}).get('CurrentCashValue')
-                    jackpot_info['next_draw_date'] = data.get('Jackpot', {}).get('NextDrawDate')
-
-                # Get winning numbers
-                if 'Drawing' in data:
-                    result = {
-                        'date': data['Drawing'].get('DrawDate'),
-                        'numbers': data['Drawing'].get('WinningNumbers', []),
-                        'megaball': data['Drawing'].get('MegaBall'),
-                        'megaplier': data['Drawing'].get('Megaplier'),
-                        'jackpot': data['Drawing'].get('Jackpot')
-                    }
-                    jackpot_info['recent_results'].append(result)
-        except Exception as e:
-            print(f"Mega Millions API error: {e}")
-
-        # Fallback 1: scrape from lottery.net
-        if not jackpot_info['current_jackpot']:
-            print("  Mega Millions API failed, trying lottery.net...")
-            jackpot_info.update(JackpotScraper._scrape_lottery_net('mega-millions'))
-
-        # Fallback 2: scrape from megamillions.com homepage
-        if not jackpot_info['current_jackpot']:
-            print("  lottery.net failed, trying megamillions.com homepage...")
-            try:
-                response = requests.get('https://www.megamillions.com/', headers=HEADERS, timeout=15)
-                if response.status_code == 200:
-                    html = response.text
-                    match = re.search(r'(\$\d+(?:\.\d+)?\s*(?:Million|Billion))', html, re.IGNORECASE)
-                    if match:
-                        jackpot_info['current_jackpot'] = match.group(1)
-                        print(f"  Found jackpot from homepage: {jackpot_info['current_jackpot']}")
-            except Exception as e:
-                print(f"  megamillions.com homepage error: {e}")
+    @staticmethod
+    def _scrape_homepage(url: str, timeout: float = 15) -> Dict:
+        """Last-resort jackpot scrape from an official homepage"""
+        return http.get_cached(url, JackpotScraper._parse_homepage, timeout=timeout, stream=True,
+                               budget=timeout)
 
-        return jackpot_info
+    @staticmethod
+    def _parse_homepage(response: requests.Response) -> Dict:
+        result = {'current_jackpot': None}
+        # Look for jackpot in page, reading stops at the first match
+        result['current_jackpot'] = HOMEPAGE_SPEC.scan(iter_text(response))['jackpot']
+        if result['current_jackpot']:
+            print(f"  Found jackpot from homepage: {result['current_jackpot']}")
+        return result
 
     @staticmethod
-    def _scrape_lottery_net(lottery: str) -> Dict:
+    def _scrape_lottery_net(lottery: str, timeout: float = 15) -> Dict:
         """Fallback scraper from lottery.net"""
-        result = {
-            'current_jackpot': None,
-            'cash_option': None,
-            'recent_results': []
-        }
-
         try:
             url = f'https://www.lottery.net/{lottery}/numbers'
             print(f"  Fetching from lottery.net: {url}")
-            response = requests.get(url, headers=HEADERS, timeout=15)
-            if response.status_code == 200:
-                html = response.text
-
-                # Multiple patterns for jackpot extraction
-                jackpot_patterns = [
-                    r'jackpot[^$]*(\$[\d,]+(?:\.\d+)?\s*(?:Million|Billion))',
-                    r'(\$[\d,]+(?:\.\d+)?\s*(?:Million|Billion))\s*(?:jackpot|estimated)',
-                    r'Est(?:imated)?[^$]*(\$[\d,]+(?:\.\d+)?\s*(?:Million|Billion))',
-                    r'>(\$[\d,]+(?:\.\d+)?\s*(?:Million|Billion))<',
-                    r'(\$\d+(?:\.\d+)?\s*(?:Million|Billion))',
-                ]
-
-                for pattern in jackpot_patterns:
-                    jackpot_match = re.search(pattern, html, re.IGNORECASE)
-                    if jackpot_match:
-                        result['current_jackpot'] = jackpot_match.group(1)
-                        print(f"  Found jackpot: {result['current_jackpot']}")
-                        break
-
-                # Extract recent numbers (simplified)
-                numbers_pattern = r'(\d{1,2})\s*,\s*(\d{1,2})\s*,\s*(\d{1,2})\s*,\s*(\d{1,2})\s*,\s*(\d{1,2})'
-                matches = re.findall(numbers_pattern, html)
-                for match in matches[:5]:
-                    result['recent_results'].append({
-                        'numbers': [int(n) for n in match]
-                    })
-
-                if not result['current_jackpot']:
-                    print(f"  Warning: Could not extract jackpot from lottery.net")
+            return http.get_cached(url, JackpotScraper._parse_lottery_net, timeout=timeout, stream=True,
+                                   budget=timeout)
         except Exception as e:
             print(f"lottery.net scrape error: {e}")
 
-        return result
+        return {
+            'current_jackpot': None,
+            'cash_option': None,
+            'recent_results': []
+        }
 
     @staticmethod
-    def _scrape_usamega(lottery: str) -> Dict:
-        """Backup scraper from usamega.com"""
+    def _parse_lottery_net(response: requests.Response) -> Dict:
         result = {
             'current_jackpot': None,
+            'cash_option': None,
             'recent_results': []
         }
 
+        # Jackpot patterns and recent numbers (simplified) in a single pass
+        scraped = LOTTERY_NET_SPEC.scan(iter_text(response))
+        result['current_jackpot'] = scraped['jackpot']
+        if result['current_jackpot']:
+            print(f"  Found jackpot: {result['current_jackpot']}")
+        result['recent_results'] = [{'numbers': numbers} for numbers in scraped['recent_numbers']]
+
+        if not result['current_jackpot']:
+            print(f"  Warning: Could not extract jackpot from lottery.net")
+
+        return result
+
+    @staticmethod
+    def _scrape_usamega(lottery: str, timeout: float = 15) -> Dict:
+        """Backup scraper from usamega.com"""
         try:
             url = f'https://www.usamega.com/{lottery}/'
-            response = requests.get(url, headers=HEADERS, timeout=15)
-            if response.status_code == 200:
-                html = response.text
-
-                # Extract jackpot
-                jackpot_match = re.search(r'Est\.\s*Jackpot[:\s]*\$?([\d,]+)\s*(?:Million|Billion)?', html, re.IGNORECASE)
-                if jackpot_match:
-                    amount = jackpot_match.group(1).replace(',', '')
-                    result['current_jackpot'] = f"${amount} Million"
+            return http.get_cached(url, JackpotScraper._parse_usamega, timeout=timeout, stream=True,
+                                   budget=timeout)
         except Exception as e:
             print(f"usamega scrape error: {e}")
 
+        return {
+            'current_jackpot': None,
+            'recent_results': []
+        }
+
+    @staticmethod
+    def _parse_usamega(response: requests.Response) -> Dict:
+        result = {
+            'current_jackpot': None,
+            'recent_results': []
+        }
+
+        # Extract jackpot
+        amount = USAMEGA_SPEC.scan(iter_text(response))['jackpot']
+        if amount:
+            result['current_jackpot'] = f"${amount} Million"
+
         return result
 
 
 class LotteryService:
     """Service to fetch lottery data and generate predictions"""
 
-    def __init__(self, lottery_type: str):
+    def __init__(self, lottery_type: str, store: Optional[HistoryStore] = None):
         if lottery_type not in LOTTERY_CONFIG:
             raise ValueError(f"Unknown lottery type: {lottery_type}")
         self.lottery_type = lottery_type
         self.config = LOTTERY_CONFIG[lottery_type]
+        self.store = store or HistoryStore()
         self.history: List[Dict] = []
         self.jackpot_info: Dict = {}
+        self.jackpot_index = JackpotIndex()
+        self._frequency: Optional[FrequencyEngine] = None
+        self._co_occurrence: Optional[CoOccurrenceIndex] = None
+        self._frequency_source: Optional[List[Dict]] = None
+        # Derived analytics persist next to the store and are reused while the history is unchanged
+        self.stats_cache = StatsCache(os.path.join(os.path.dirname(os.path.abspath(self.store.path)), 'stats_cache'))
+        # So does the shared client's conditional-GET cache, so another data dir gets its own
+        http.use_cache_dir(os.path.join(os.path.dirname(os.path.abspath(self.store.path)), 'http_cache'))
+        self._fingerprint: Optional[str] = None
+        self._fingerprint_source: Optional[List[Dict]] = None
+        # Memory-mapped copy of the stored draws, refreshed by fetch_history
+        self.archive: Optional[np.ndarray] = None
+        self._archive_source: Optional[List[Dict]] = None
+        self.combo_index = ComboIndex(self.config['main_range'], self.config['special_range'])
+        # Best known wheels by shape, shared by every lottery
+        self.wheel_cache = WheelCache(os.path.join(os.path.dirname(os.path.abspath(self.store.path)), 'wheel_cache'))
 
     def fetch_jackpot(self) -> Dict:
         """Fetch current jackpot information"""
         print(f"Fetching jackpot for {self.config['name']}...")
 
-        if self.lottery_type == 'powerball':
-            self.jackpot_info = JackpotScraper.fetch_powerball_jackpot()
-        else:
-            self.jackpot_info = JackpotScraper.fetch_mega_millions_jackpot()
+        self.jackpot_info = JackpotScraper.fetch_jackpot(self.config, health=SourceHealth(self.store.path))
 
         if self.jackpot_info.get('current_jackpot'):
             print(f"  Current jackpot: {self.jackpot_info['current_jackpot']}")
@@ -306,6 +434,8 @@ class LotteryService:
             print("  Could not fetch jackpot, using estimate")
             self.jackpot_info['current_jackpot'] = self._estimate_jackpot()
 
+        self.jackpot_index = JackpotIndex()
+        self.jackpot_index.add_results(self.jackpot_info.get('recent_results', []))
         return self.jackpot_info
 
     def _estimate_jackpot(self) -> str:
@@ -313,62 +443,172 @@ class LotteryService:
         # Return a clear message instead of random estimate
         return "Check official site"
 
-    def fetch_history(self, limit: int = 100) -> List[Dict]:
-        """Fetch historical draw results from public API"""
+    def fetch_history(self, limit: Optional[int] = None) -> List[Dict]:
+        """Sync new draws into the local history store and load them
+
+        Only draws newer than the stored checkpoint are requested from the
+        public API, so a typical run pulls zero or one row. `limit` caps how
+        many of the newest stored draws are loaded into self.history.
+        """
         # First try to get jackpot info which may have recent results
         if not self.jackpot_info:
             self.fetch_jackpot()
 
+        checkpoint = self.store.get_checkpoint(self.lottery_type)
+        added = 0
         try:
-            url = f"{self.config['api_url']}?$limit={limit}&$order=draw_date DESC"
-            response = requests.get(url, headers=HEADERS, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            self.history = []
-            for item in data:
-                try:
-                    # Parse based on lottery type
-                    if self.lottery_type == 'powerball':
-                        numbers = [int(item.get('winning_numbers', '').split()[i]) for i in range(5)]
-                        special = int(item.get('winning_numbers', '').split()[5]) if len(item.get('winning_numbers', '').split()) > 5 else 0
-                    else:
-                        numbers = [int(item.get('winning_numbers', '').split()[i]) for i in range(5)]
-                        special = int(item.get('mega_ball', 0))
-
-                    # Try to find jackpot from scraped data
-                    draw_date = item.get('draw_date', '')[:10]
-                    jackpot = self._find_jackpot_for_date(draw_date)
-
-                    self.history.append({
-                        'date': draw_date,
-                        'numbers': numbers,
-                        'special': special,
-                        'jackpot': jackpot or item.get('jackpot', 'Unknown'),
-                        'multiplier': item.get('multiplier')
-                    })
-                except (ValueError, IndexError, KeyError) as e:
-                    continue
-
-            print(f"Fetched {len(self.history)} historical draws for {self.config['name']}")
-            return self.history
+            # Append page by page so memory stays flat and progress survives failures
+            for page in self._iter_history_pages(checkpoint):
+                added += self.store.append(self.lottery_type, page['draws'])
+            print(f"Synced {added} new draws for {self.config['name']} (checkpoint: {checkpoint or 'none'})")
 
         except Exception as e:
             print(f"Error fetching history: {e}")
-            # Use mock data if API fails
-            return self._generate_mock_history(limit)
+            if not self.store.count(self.lottery_type):
+                # Use mock data if API fails and nothing is stored yet
+                return self._generate_mock_history(limit or 100)
+
+        self.history = self.store.load(self.lottery_type, limit)
+        print(f"Loaded {len(self.history)} historical draws for {self.config['name']}")
+        self._sync_co_occurrence()
+        self._sync_archive(limit)
+        return self.history
+
+    def _iter_history_pages(self, since: Optional[str]) -> Iterator[Dict]:
+        def fetch_page(offset: int, page_size: int) -> Dict:
+            params = {'$order': 'draw_date ASC', '$limit': page_size, '$offset': offset}
+            if since:
+                params['$where'] = f"draw_date > '{since}T00:00:00'"
+            return http.get_cached(self.config['api_url'], self._parse_history_page,
+                                   params=params, timeout=30, stream=True)
+
+        return iter_pages(fetch_page, size=lambda page: page['records'])
+
+    def _parse_history_page(self, response: requests.Response) -> Dict:
+        """Decode one page as it streams in, keeping the raw count for paging"""
+        records = 0
+        draws = []
+        for item in iter_json_array(response.iter_content(chunk_size=16384)):
+            records += 1
+            draw = self._parse_draw(item)
+            if draw:
+                draws.append(draw)
+        return {'records': records, 'draws': draws}
+
+    def _sync_co_occurrence(self):
+        """Fold newly stored draws into the persisted co-occurrence index
+
+        Failures only cost the persisted copy: the index is then rebuilt in
+        memory on first use, and the fetch carries on.
+        """
+        path = os.path.join(os.path.dirname(os.path.abspath(self.store.path)),
+                            f'co_occurrence_{self.lottery_type}.npz')
+        max_number = self.config['main_range'][1]
+        try:
+            index = CoOccurrenceIndex.load(path, max_number)
+            added = index.update(self.history)
+
+            stored = self.store.count(self.lottery_type)
+            if index.draws != stored:
+                # Out of sync with the store (e.g. back-filled draws), recount once
+                print(f"  Rebuilding co-occurrence index ({index.draws} indexed, {stored} stored)")
+                index = CoOccurrenceIndex(max_number)
+                added = index.update(self.store.load(self.lottery_type))
+
+            if added:
+                index.save(path)
+        except (OSError, ValueError) as e:
+            print(f"  Could not sync co-occurrence index: {e}")
+            index = None
+        self._co_occurrence = index
+
+    def drawn_combinations(self) -> ComboSet:
+        """Main-number combinations in the current history as a rank bitmap
+
+        Draws from older, wider number ranges can't be played today and are left out.
+        """
+        if self._archive_current():
+            numbers = np.asarray(self.archive['numbers'], dtype=np.int64)
+        else:
+            numbers = np.array([d['numbers'][:5] for d in self.history], dtype=np.int64).reshape(-1, 5)
+        lo, hi = self.config['main_range']
+        numbers = numbers[((numbers >= lo) & (numbers <= hi)).all(axis=1)]
+        return ComboSet(self.combo_index.main_size, self.combo_index.rank_main(numbers))
+
+    def _sync_archive(self, limit: Optional[int] = None):
+        """Bring the binary draw archive up to the store, then map the part self.history covers
+
+        The store is append-only, so an archive whose header has the store's
+        count and newest date holds exactly its draws and only the header is
+        read. Newer draws are appended; anything else rewrites the archive.
+        """
+        path = archive_path(os.path.dirname(os.path.abspath(self.store.path)), self.lottery_type)
+        count = self.store.count(self.lottery_type)
+        newest = self.history[0]['date'] if self.history else None
+        header = read_header(path)
+        if header and header['count'] == count and header['checkpoint'] == newest:
+            pass
+        elif header and header['count'] < count and (header['checkpoint'] or '') < (newest or ''):
+            newer = self.store.load(self.lottery_type, since=header['checkpoint'])
+            if header['count'] + len(newer) == count:
+                append_archive(path, newer)
+            else:
+                write_archive(path, self.store.load(self.lottery_type))
+        else:
+            write_archive(path, self.history if not limit else self.store.load(self.lottery_type))
+
+        records = open_archive(path)
+        # The history holds the newest draws, which are the archive's last rows
+        if records is not None and len(records) == count and len(self.history) <= count:
+            self.archive = records[count - len(self.history):]
+            self._archive_source = self.history
+        else:
+            self.archive = self._archive_source = None
+
+    def _archive_current(self) -> bool:
+        """Whether the mapped archive holds exactly the current history"""
+        return self.archive is not None and self._archive_source is self.history
+
+    @property
+    def co_occurrence(self) -> CoOccurrenceIndex:
+        """Co-occurrence index for the current history"""
+        if self._co_occurrence is None:
+            # History not backed by the store (e.g. mock data), index it in memory only
+            self._co_occurrence = CoOccurrenceIndex(self.config['main_range'][1])
+            self._co_occurrence.update(self.history)
+        return self._co_occurrence
+
+    def _parse_draw(self, item: Dict) -> Optional[Dict]:
+        """Parse a raw API record into a draw dict, None if malformed"""
+        try:
+            # Parse with the game's declared record parser
+            draw_date, numbers, special = self.config['parse_record'](item, self.config)
+
+            # Both number ranges changed over the years (Mega Millions drew 1-75 from 2013 to 2017),
+            # so draws are only checked for shape, not against today's ranges
+            if (len(draw_date) != 10 or len(set(numbers)) != 5
+                    or not all(n > 0 for n in numbers) or special < 0):
+                return None
+
+            # Try to find jackpot from scraped data
+            jackpot = self._find_jackpot_for_date(draw_date)
+
+            return {
+                'date': draw_date,
+                'numbers': numbers,
+                'special': special,
+                'jackpot': jackpot or item.get('jackpot', 'Unknown'),
+                'multiplier': item.get('multiplier')
+            }
+        except (ValueError, IndexError, KeyError):
+            return None
 
     def _find_jackpot_for_date(self, date: str) -> Optional[str]:
         """Find jackpot amount for a specific date from scraped data"""
-        if not self.jackpot_info or 'recent_results' not in self.jackpot_info:
+        entry = self.jackpot_index.get(date)
+        if not entry:
             return None
-
-        for result in self.jackpot_info.get('recent_results', []):
-            result_date = result.get('date', '')
-            if result_date and date in result_date:
-                return result.get('jackpot')
-
-        return None
+        return entry['display'] or f"${entry['amount']:,}"
 
     def _generate_mock_history(self, count: int = 50) -> List[Dict]:
         """Generate mock historical data for testing"""
@@ -404,6 +644,31 @@ class LotteryService:
             'draw_days': self.config['draw_days']
         }
 
+    def get_jackpot_history(self) -> Dict:
+        """Jackpot time series in whole dollars from stored draws and recent results"""
+        if not self.history:
+            self.fetch_history()
+
+        index = JackpotIndex()
+        index.add_results(reversed(self.history))
+        # Scraped results are fresher than what was stored with the draw
+        for date, entry in self.jackpot_index.entries.items():
+            index.entries[date] = entry
+
+        current = self.jackpot_info.get('current_jackpot') if self.jackpot_info else None
+        return {
+            'lottery': self.config['name'],
+            'lottery_type': self.lottery_type,
+            'last_updated': datetime.now().isoformat(),
+            'current': {
+                'next_draw_date': normalize_date(self.jackpot_info.get('next_draw_date'))
+                                  or self._get_next_draw_date(),
+                'amount': parse_amount(current),
+                'display': current if isinstance(current, str) else None
+            },
+            'draws': index.series()
+        }
+
     def get_latest_results(self) -> Dict:
         """Get the latest draw results"""
         if not self.history:
@@ -429,169 +694,281 @@ class LotteryService:
             ]
         }
 
-    def get_hot_cold_numbers(self, lookback: int = 50) -> Dict:
-        """Analyze hot and cold numbers"""
+    @property
+    def frequency(self) -> FrequencyEngine:
+        """Frequency engine over the current history, rebuilt when history changes"""
+        if self._frequency is None or self._frequency_source is not self.history:
+            if self._archive_current():
+                self._frequency = FrequencyEngine.from_records(self.archive, self.config['main_range'],
+                                                               self.config['special_range'])
+            else:
+                self._frequency = FrequencyEngine(self.history, self.config['main_range'],
+                                                  self.config['special_range'])
+            self._frequency_source = self.history
+        return self._frequency
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the current history, the key for cached analytics"""
+        if self._fingerprint is None or self._fingerprint_source is not self.history:
+            self._fingerprint = history_fingerprint(self.history, self.config)
+            self._fingerprint_source = self.history
+        return self._fingerprint
+
+    def get_hot_cold_numbers(self, lookback: int = 50,
+                             windows: Optional[Sequence[Window]] = None) -> Dict:
+        """Analyze hot and cold numbers
+
+        The top-level fields describe `lookback`; any extra `windows`
+        (draw counts or 'all') are published under 'windows' from the same
+        prefix-count tables.
+        """
         if not self.history:
             self.fetch_history()
 
-        recent = self.history[:lookback]
+        extra = [w for w in (windows or []) if w != lookback]
+        analysis = self.stats_cache.get_or_compute('hot_cold', self.fingerprint, [lookback] + extra,
+                                                   lambda: self.frequency.analyze([lookback] + extra))
+        primary = analysis[str(lookback)]
 
-        # Count main number frequencies
-        main_counter = Counter()
-        special_counter = Counter()
-
-        for draw in recent:
-            for num in draw['numbers']:
-                main_counter[num] += 1
-            special_counter[draw['special']] += 1
-
-        # Get hot (most common) and cold (least common) numbers
-        all_main = list(range(self.config['main_range'][0], self.config['main_range'][1] + 1))
-        all_special = list(range(self.config['special_range'][0], self.config['special_range'][1] + 1))
+        result = {
+            'lottery': self.config['name'],
+            'lottery_type': self.lottery_type,
+            'analysis_period': f"Last {lookback} draws",
+            'last_updated': datetime.now().isoformat(),
+            'hot_numbers': primary['hot_numbers'],
+            'cold_numbers': primary['cold_numbers'],
+            'frequency': primary['frequency']
+        }
+        if windows:
+            result['windows'] = {str(w): analysis[str(w)] for w in windows}
+        return result
 
-        hot_main = [num for num, _ in main_counter.most_common(10)]
-        # Cold numbers: sort all numbers by frequency (ascending), take lowest 10
-        main_with_counts = [(num, main_counter.get(num, 0)) for num in all_main]
-        main_with_counts.sort(key=lambda x: x[1])  # Sort by count ascending
-        cold_main = [num for num, _ in main_with_counts[:10]]
+    def get_co_occurrence(self, limit: int = 20) -> Dict:
+        """Most frequent pairs, triplets and per-number partners"""
+        if not self.history:
+            self.fetch_history()
 
-        hot_special = [num for num, _ in special_counter.most_common(5)]
-        # Cold special: sort by frequency ascending
-        special_with_counts = [(num, special_counter.get(num, 0)) for num in all_special]
-        special_with_counts.sort(key=lambda x: x[1])
-        cold_special = [num for num, _ in special_with_counts[:5]]
+        def rank() -> Dict:
+            index = self.co_occurrence
+            main_range = range(self.config['main_range'][0], self.config['main_range'][1] + 1)
+            return {
+                'draws_analyzed': index.draws,
+                'last_draw_date': index.last_date,
+                'top_pairs': index.top_pairs(limit),
+                'top_triplets': index.top_triplets(limit),
+                'partners': {str(n): index.partners(n) for n in main_range}
+            }
 
+        ranked = self.stats_cache.get_or_compute('co_occurrence', self.fingerprint,
+                                                 [limit, self.co_occurrence.draws], rank)
         return {
             'lottery': self.config['name'],
             'lottery_type': self.lottery_type,
-            'analysis_period': f"Last {lookback} draws",
+            'draws_analyzed': ranked['draws_analyzed'],
+            'last_draw_date': ranked['last_draw_date'],
             'last_updated': datetime.now().isoformat(),
-            'hot_numbers': {
-                'main': hot_main,
-                'special': hot_special
-            },
-            'cold_numbers': {
-                'main': cold_main,
-                'special': cold_special
-            },
-            'frequency': {
-                # Include all numbers that appeared, plus cold numbers with 0
-                'main': {str(num): main_counter.get(num, 0) for num in hot_main + cold_main},
-                'special': {str(num): special_counter.get(num, 0) for num in hot_special + cold_special}
-            }
+            'top_pairs': ranked['top_pairs'],
+            'top_triplets': ranked['top_triplets'],
+            'partners': ranked['partners']
         }
 
-    def generate_predictions(self, count: int = 5) -> Dict:
-        """Generate AI predictions using various strategies"""
+    def generate_predictions(self, count: int = 5, backtest: Optional[Dict] = None) -> Dict:
+        """Generate AI predictions using various strategies
+
+        When a backtest report is given, each prediction carries its
+        strategy's measured hit rates under 'backtest'.
+        """
         if not self.history:
             self.fetch_history()
 
         hot_cold = self.get_hot_cold_numbers()
         predictions = []
 
+        # Same picks until the next draw or a new result, so reruns don't rewrite the file
+        next_draw = self._get_next_draw_date()
+        latest = self.history[0]['date'] if self.history else ''
+        rng = np.random.default_rng(request_seed(self.lottery_type, next_draw, latest))
+
         for i, strategy in enumerate(STRATEGIES[:count]):
-            numbers = self._generate_numbers_by_strategy(strategy['id'], hot_cold)
-            predictions.append({
+            numbers = self._generate_numbers_by_strategy(strategy['id'], hot_cold, rng)
+            prediction = {
                 'id': i + 1,
                 'numbers': sorted(numbers['main']),
                 'special_ball': numbers['special'],
                 'strategy': strategy['name'],
                 'strategy_id': strategy['id'],
-                'confidence': round(random.uniform(0.65, 0.95), 2),
+                'confidence': round(float(rng.uniform(0.65, 0.95)), 2),
                 'description': strategy['description']
-            })
+            }
+            measured = (backtest or {}).get('strategies', {}).get(strategy['id'])
+            if measured:
+                prediction['backtest'] = {
+                    'draws_tested': backtest['draws_tested'],
+                    'avg_matches': measured['avg_matches'],
+                    'prize_rate': measured['prize_rate']
+                }
+            predictions.append(prediction)
+
+        # Flag picks whose exact main numbers have already come up
+        drawn = self.drawn_combinations()
+        ranks = self.combo_index.rank_main([p['numbers'] for p in predictions])
+        for prediction, previously in zip(predictions, drawn.contains(ranks).tolist()):
+            prediction['previously_drawn'] = previously
 
         return {
             'lottery': self.config['name'],
             'lottery_type': self.lottery_type,
             'generated_at': datetime.now().isoformat(),
-            'next_draw': self._get_next_draw_date(),
+            'next_draw': next_draw,
             'current_jackpot': self.jackpot_info.get('current_jackpot') if self.jackpot_info else None,
             'predictions': predictions
         }
 
-    def _generate_numbers_by_strategy(self, strategy: str, hot_cold: Dict) -> Dict:
-        """Generate numbers based on strategy"""
-        main_range = range(self.config['main_range'][0], self.config['main_range'][1] + 1)
-        special_range = range(self.config['special_range'][0], self.config['special_range'][1] + 1)
-
-        hot_main = hot_cold['hot_numbers']['main']
-        cold_main = hot_cold['cold_numbers']['main']
-
-        if strategy == 'frequency':
-            # Prefer hot numbers
-            pool = hot_main + list(main_range)
-            main = random.sample(hot_main, min(3, len(hot_main)))
-            remaining = [n for n in main_range if n not in main]
-            main += random.sample(remaining, 5 - len(main))
-            special = random.choice(hot_cold['hot_numbers']['special']) if hot_cold['hot_numbers']['special'] else random.choice(list(special_range))
-
-        elif strategy == 'cold':
-            # Prefer cold numbers
-            main = random.sample(cold_main, min(3, len(cold_main)))
-            remaining = [n for n in main_range if n not in main]
-            main += random.sample(remaining, 5 - len(main))
-            special = random.choice(hot_cold['cold_numbers']['special']) if hot_cold['cold_numbers']['special'] else random.choice(list(special_range))
-
-        elif strategy == 'balanced':
-            # Mix of hot and cold
-            main = random.sample(hot_main, min(2, len(hot_main)))
-            main += random.sample(cold_main, min(2, len(cold_main)))
-            remaining = [n for n in main_range if n not in main]
-            main += random.sample(remaining, 5 - len(main))
-            special = random.choice(list(special_range))
-
-        elif strategy == 'pattern':
-            # Pattern-based (consecutive, spread, etc.)
-            start = random.randint(self.config['main_range'][0], self.config['main_range'][1] - 20)
-            main = [start, start + random.randint(5, 10), start + random.randint(15, 25)]
-            remaining = [n for n in main_range if n not in main]
-            main += random.sample(remaining, 5 - len(main))
-            special = random.choice(list(special_range))
-
-        else:  # random
-            main = random.sample(list(main_range), 5)
-            special = random.choice(list(special_range))
-
-        return {'main': main[:5], 'special': special}
+    def generate_wheel(self, pool: Optional[Sequence[int]] = None, pool_size: int = DEFAULT_WHEEL[0],
+                       guarantee: int = DEFAULT_WHEEL[1], if_drawn: int = DEFAULT_WHEEL[2]) -> Dict:
+        """Fewest tickets over `pool` matching at least `guarantee` numbers whenever `if_drawn` of it are drawn
+
+        The pool defaults to the `pool_size` hottest numbers of the last
+        50 draws. Wheels depend only on the pool's size, so they come from
+        the wheel cache (the default shape ships precomputed), or from a
+        search bounded to well under a second; shapes too large for that
+        raise ValueError until precomputed with --precompute-wheels.
+        """
+        if pool is None:
+            if not self.history:
+                self.fetch_history()
+            analysis = self.stats_cache.get_or_compute(
+                'wheel_pool', self.fingerprint, [50, pool_size],
+                lambda: self.frequency.analyze([50], hot_count=pool_size))
+            pool = analysis['50']['hot_numbers']['main']
+            specials = analysis['50']['hot_numbers']['special']
+        else:
+            specials = []
+        pool = sorted(set(pool))
+        lo, hi = self.config['main_range']
+        if any(n < lo or n > hi for n in pool):
+            raise ValueError(f"Pool numbers must be in {self.config['main_range']}")
+
+        tickets = apply_wheel(pool, find_wheel(len(pool), guarantee, if_drawn, self.wheel_cache))
+        specials = specials or list(range(self.config['special_range'][0], self.config['special_range'][1] + 1))
+        return {
+            'lottery': self.config['name'],
+            'lottery_type': self.lottery_type,
+            'generated_at': datetime.now().isoformat(),
+            'next_draw': self._get_next_draw_date(),
+            'pool': pool,
+            'guarantee': guarantee,
+            'if_drawn': if_drawn,
+            'lower_bound': lower_bound(len(pool), guarantee, if_drawn),
+            'tickets': [{'numbers': numbers, 'special_ball': specials[i % len(specials)]}
+                        for i, numbers in enumerate(tickets)]
+        }
 
-    def _get_next_draw_date(self) -> str:
-        """Get the next draw date"""
-        today = datetime.now()
-        draw_days = self.config['draw_days']
+    def run_backtest(self, trials: int = 200, workers: Optional[int] = None) -> Dict:
+        """Replay stored history and score every strategy against real draws"""
+        if not self.history:
+            self.fetch_history()
 
-        for i in range(7):
-            check_date = today + timedelta(days=i)
-            if check_date.strftime('%A') in draw_days:
-                if i == 0 and today.hour >= 23:
-                    continue
-                return check_date.strftime('%Y-%m-%d')
+        print(f"Backtesting {len(self.history)} draws for {self.config['name']} ({trials} trials per draw)...")
+        report = run_backtest(self.history, self.config['main_range'], self.config['special_range'],
+                              trials=trials, workers=workers)
+        return {
+            'lottery': self.config['name'],
+            'lottery_type': self.lottery_type,
+            **report
+        }
 
-        return (today + timedelta(days=1)).strftime('%Y-%m-%d')
+    def write_bulk_predictions(self, out, count: int, strategy: str, segment: str = 'default',
+                               request_id: str = '', window: Window = 50,
+                               seen: Optional[List[np.ndarray]] = None) -> int:
+        """Stream `count` tickets for one user segment as NDJSON, returns tickets written
 
-    def get_daily_fortune(self) -> Dict:
-        """Generate daily fortune and lucky numbers"""
-        today = datetime.now()
-        random.seed(today.strftime('%Y%m%d') + self.lottery_type)
+        Draws come from the local history store. The seed covers lottery,
+        next draw, latest stored draw, segment, request id and strategy, so
+        repeating a request reproduces its tickets until the next result.
+        With `seen`, each batch's ticket ranks are appended to it as an array.
+        """
+        if not self.history:
+            self.history = self.store.load(self.lottery_type)
+        if not self.history:
+            raise ValueError(f"No stored draws for {self.config['name']}")
+
+        sampler = BulkSampler(self.frequency, self.co_occurrence, self.config['main_range'],
+                              self.config['special_range'], window)
+        next_draw = self._get_next_draw_date()
+        seed = request_seed(self.lottery_type, next_draw, self.history[0]['date'],
+                            segment, request_id, strategy)
+        on_batch = (lambda main, special: seen.append(self.combo_index.rank(main, special))) if seen is not None else None
+        return write_ndjson(sampler, out, seed, strategy, count,
+                            extra={'segment': segment, 'draw_date': next_draw}, on_batch=on_batch)
+
+    def get_ticket_checker(self, draw_dates: Optional[List[str]] = None,
+                           results_path: Optional[str] = None) -> TicketChecker:
+        """Ticket checker for the given draw dates (default: the latest draw)
+
+        Draws come from the local history store, falling back to a
+        previously written latest_results.json, so checking needs no network.
+        """
+        draws = self.store.load(self.lottery_type)
+        if not draws and results_path:
+            latest = load_json(results_path) or {}
+            draws = [
+                {'date': r['draw_date'], 'numbers': r['numbers'], 'special': r['special_ball']}
+                for r in latest.get('results', [])
+            ]
+        if not draws:
+            raise ValueError(f"No stored draws for {self.config['name']}")
+
+        if draw_dates:
+            by_date = {d['date']: d for d in draws}
+            missing = [date for date in draw_dates if date not in by_date]
+            if missing:
+                raise ValueError(f"No {self.config['name']} draw on {', '.join(missing)}")
+            draws = [by_date[date] for date in draw_dates]
+        else:
+            draws = draws[:1]
 
-        fortunes = [
-            "The stars align in your favor today. Trust your instincts!",
-            "Fortune favors the bold. Take a chance on your dreams!",
-            "Your lucky energy is especially strong today. Good things are coming!",
-            "The universe is sending positive vibrations your way. Stay optimistic!",
-            "Today brings opportunities for unexpected winnings. Keep your eyes open!",
-        ]
+        return TicketChecker(draws, self.config['prize_tiers'],
+                             self.config['main_range'], self.config['special_range'])
 
-        lucky_numbers = sorted(random.sample(range(1, 70), 6))
+    def _generate_numbers_by_strategy(self, strategy: str, hot_cold: Dict,
+                                      rng: Optional[np.random.Generator] = None) -> Dict:
+        """Generate numbers based on strategy, with the generator the backtest scores"""
+        main, special = generate_tickets(rng or np.random.default_rng(), strategy, 1, hot_cold,
+                                         self.co_occurrence, self.config['main_range'],
+                                         self.config['special_range'])
+        return {'main': main[0].tolist(), 'special': int(special[0])}
 
+    def _get_next_draw_date(self) -> str:
+        """Get the next draw date"""
+        return next_draw_date(self.config['draw_days'], datetime.now())
+
+    def fetch_latest_draw_date(self) -> Optional[str]:
+        """Newest draw date on the public API, a single one-row query"""
+        response = http.get(self.config['api_url'], params={'$select': 'max(draw_date) AS latest'}, timeout=15)
+        response.raise_for_status()
+        rows = response.json()
+        return rows[0]['latest'][:10] if rows and rows[0].get('latest') else None
+
+    def plan_refresh(self, state: Dict) -> RefreshPlan:
+        """Whether this lottery's files need regenerating, see refresh_planner.plan_refresh"""
+        return plan_refresh(self.lottery_type, self.config['draw_days'],
+                            self.store.get_checkpoint(self.lottery_type), state,
+                            self.fetch_latest_draw_date)
+
+    def get_daily_fortune(self, user_id: UserId = SITE_USER, date: Optional[str] = None) -> Dict:
+        """Daily fortune and lucky numbers, for the whole site or one user
+
+        Derived from a hash of (user, date, lottery) without any RNG state,
+        so it matches the precomputed fortune shards.
+        """
+        table = FortuneTable(self.lottery_type, date or datetime.now().strftime('%Y-%m-%d'),
+                             self.config['main_range'])
         return {
             'lottery': self.config['name'],
             'lottery_type': self.lottery_type,
-            'date': today.strftime('%Y-%m-%d'),
-            'fortune': random.choice(fortunes),
-            'lucky_numbers': lucky_numbers,
-            'lucky_color': random.choice(['Gold', 'Red', 'Blue', 'Green', 'Purple']),
-            'lucky_time': f"{random.randint(1, 12)}:{random.choice(['00', '15', '30', '45'])} {'AM' if random.random() > 0.5 else 'PM'}"
+            **table.fortune(user_id)
         }
 
 
@@ -614,79 +991,460 @@ def generate_quotes() -> List[Dict]:
     return quotes
 
 
-def generate_manifest() -> Dict:
-    """Generate API manifest"""
+def generate_manifest(history: Optional[Dict[str, Dict]] = None) -> Dict:
+    """Generate API manifest
+
+    `history` maps each lottery to its export index (shard hashes and
+    available delta dates) so clients fetch only what changed.
+    """
     return {
-        'version': '1.1.0',
+        'version': '1.5.0',
         'last_updated': datetime.now().isoformat(),
-        'lotteries': ['powerball', 'mega_millions'],
+        'lotteries': lottery_types(),
         'endpoints': {
             'latest_results': '/{lottery}/latest_results.json',
             'hot_cold': '/{lottery}/hot_cold_numbers.json',
+            'co_occurrence': '/{lottery}/co_occurrence.json',
             'predictions': '/{lottery}/ai_predictions.json',
             'fortune': '/{lottery}/daily_fortune.json',
             'jackpot': '/{lottery}/jackpot.json',
+            'jackpot_history': '/{lottery}/jackpot_history.json',
+            'wheel': '/{lottery}/wheel.json',
+            'backtest': '/{lottery}/backtest_report.json',
             'quotes': '/daily_quotes.json',
-        }
+            'history_shard': '/{lottery}/history/{year}.json',
+            'history_shard_binary': '/{lottery}/history/{year}.bin',
+            'history_since': '/{lottery}/history_since/{date}.json',
+        },
+        'history_binary_format': BINARY_FORMAT,
+        'history': history or {}
     }
 
 
+def load_json(filepath: str) -> Optional[Dict]:
+    """Load a previously written JSON file, None if missing or unreadable"""
+    try:
+        with open(filepath, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
 def save_json(data: Dict, filepath: str):
-    """Save data to JSON file"""
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"Saved: {filepath}")
+    """Save data to JSON file, skipping it when only timestamps changed"""
+    # One write per line so lines from concurrent pipeline stages don't interleave
+    if write_json(data, filepath):
+        print(f"Saved: {filepath}\n", end='')
+    else:
+        print(f"Unchanged: {filepath}\n", end='')
+
+
+def lottery_pipeline(service: LotteryService, lottery_dir: str, write: bool = True) -> Pipeline:
+    """Stages producing one lottery's outputs, keyed by the state they read from `service`
+
+    File stages return their payload and, with `write`, also save it.
+    'history_export' writes the year shards and deltas and returns their
+    index, or without `write` returns build_history_files' (files, index).
+    """
+    def output(stage: str, build: Callable[[], Dict]) -> Callable[[], Dict]:
+        def run() -> Dict:
+            data = build()
+            if write:
+                save_json(data, os.path.join(lottery_dir, OUTPUT_FILES[stage]))
+            return data
+        return run
+
+    def history_export():
+        if write:
+            return export_history(service.history, lottery_dir)
+        return build_history_files(service.history)
+
+    return Pipeline([
+        Stage('fetch_jackpot', service.fetch_jackpot),
+        # Newly synced draws take their jackpot from the scraped recent results
+        Stage('fetch_history', service.fetch_history, ['fetch_jackpot']),
+        Stage('latest_results', output('latest_results', service.get_latest_results),
+              ['fetch_history', 'fetch_jackpot']),
+        Stage('hot_cold', output('hot_cold', lambda: service.get_hot_cold_numbers(windows=HOT_COLD_WINDOWS)),
+              ['fetch_history']),
+        Stage('co_occurrence', output('co_occurrence', service.get_co_occurrence), ['fetch_history']),
+        Stage('predictions', output('predictions', lambda: service.generate_predictions(
+            backtest=load_json(os.path.join(lottery_dir, 'backtest_report.json')))),
+              ['fetch_history', 'fetch_jackpot']),
+        Stage('fortune', output('fortune', service.get_daily_fortune)),
+        Stage('jackpot', output('jackpot', service.get_jackpot_info), ['fetch_jackpot']),
+        Stage('jackpot_history', output('jackpot_history', service.get_jackpot_history),
+              ['fetch_history', 'fetch_jackpot']),
+        Stage('wheel', output('wheel', service.generate_wheel), ['fetch_history']),
+        Stage('history_export', history_export, ['fetch_history']),
+    ])
+
+
+def lottery_files(service: LotteryService, lottery_dir: str) -> Dict[str, Dict]:
+    """Output payloads for an already fetched lottery keyed by file name"""
+    results = lottery_pipeline(service, lottery_dir, write=False).run(
+        OUTPUT_FILES, done={'fetch_jackpot': service.jackpot_info, 'fetch_history': service.history},
+        around=metrics.stage)
+    return {filename: results[stage] for stage, filename in OUTPUT_FILES.items()}
+
+
+def process_lottery(lottery_type: str, store: HistoryStore, output_dir: str,
+                    profile_dir: Optional[str] = None, only: Optional[List[str]] = None) -> Tuple[Optional[Dict], Dict]:
+    """Run one lottery's pipeline (or just the `only` stages and their inputs), writing its files
+
+    Returns the history index (None if 'history_export' didn't run) and
+    the metrics records; on failure the records travel on the exception
+    as `metrics`.
+    """
+    metrics.profile_dir = profile_dir
+    try:
+        with metrics.lottery(lottery_type):
+            service = LotteryService(lottery_type, store)
+            pipeline = lottery_pipeline(service, os.path.join(output_dir, lottery_type))
+            # cProfile and tracemalloc can only follow one stage at a time
+            results = pipeline.run(only, max_workers=1 if profile_dir else None, around=metrics.stage)
+    except Exception as e:
+        e.metrics = metrics.pop(lottery_type)
+        raise
+    return results.get('history_export'), metrics.pop(lottery_type)
+
+
+def build_site(lotteries: List[str], store: HistoryStore, output_dir: str,
+               previous: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """Build every output file in memory keyed by URL path, for serve mode
+
+    A lottery that fails keeps its files from `previous`. The serving
+    process refreshes indefinitely, so `metrics` only holds the latest refresh.
+    """
+    def build(lottery_type: str) -> Tuple[Dict[str, object], Dict]:
+        with metrics.lottery(lottery_type):
+            service = LotteryService(lottery_type, store)
+            results = lottery_pipeline(service, os.path.join(output_dir, lottery_type), write=False).run(
+                around=metrics.stage)
+        files = {filename: results[stage] for stage, filename in OUTPUT_FILES.items()}
+        history_files, index = results['history_export']
+        files.update(history_files)
+        return {f'/{lottery_type}/{name}': data for name, data in files.items()}, index
+
+    metrics.reset()
+    previous = previous or {}
+    site: Dict[str, object] = {}
+    history = dict((previous.get('/manifest.json') or {}).get('history', {}))
+    results = run_parallel({lottery_type: (lambda lt=lottery_type: build(lt)) for lottery_type in lotteries})
+    for lottery_type, result in results.items():
+        if isinstance(result, Exception):
+            print(f"Error processing {lottery_type}: {result}")
+            site.update({path: data for path, data in previous.items() if path.startswith(f'/{lottery_type}/')})
+        else:
+            files, history[lottery_type] = result
+            site.update(files)
+
+    site['/daily_quotes.json'] = generate_quotes()
+    site['/manifest.json'] = generate_manifest(history)
+    return site
+
+
+def backtest_lottery(lottery_type: str, store: HistoryStore, output_dir: str,
+                     trials: int, workers: Optional[int]):
+    """Backtest one lottery's strategies and write the report"""
+    service = LotteryService(lottery_type, store)
+    service.fetch_history()
+    report = service.run_backtest(trials=trials, workers=workers)
+
+    for strategy_id, stats in report['strategies'].items():
+        if stats.get('tickets'):
+            print(f"  {strategy_id:<10} avg matches {stats['avg_matches']:.4f}  "
+                  f"prize rate {stats['prize_rate']:.4f}")
+
+    save_json(report, os.path.join(output_dir, lottery_type, 'backtest_report.json'))
+
+
+def check_tickets(lottery_type: str, store: HistoryStore, output_dir: str,
+                  tickets_path: str, out_path: Optional[str], draw_dates: Optional[List[str]]):
+    """Check a ticket file against stored draws and print a tier summary"""
+    service = LotteryService(lottery_type, store)
+    checker = service.get_ticket_checker(
+        draw_dates, os.path.join(output_dir, lottery_type, 'latest_results.json'))
+
+    dates = ', '.join(d['date'] for d in checker.draws)
+    print(f"Checking {tickets_path} against {service.config['name']} draw(s) {dates}", file=sys.stderr)
+    summary = check_ticket_file(checker, tickets_path, out_path)
+    for tier, count in summary.items():
+        print(f"  {tier}: {count}", file=sys.stderr)
+
+
+def bulk_predictions(lottery_type: str, store: HistoryStore, count: int, strategy: str,
+                     segment: str, request_id: str, out_path: Optional[str]):
+    """Write bulk personalized tickets as NDJSON to out_path ('-' or None for stdout)"""
+    service = LotteryService(lottery_type, store)
+    target = sys.stdout if not out_path or out_path == '-' else open(out_path, 'w', encoding='utf-8')
+    # Eight bytes per ticket, rather than a bitmap over every possible ticket
+    seen: List[np.ndarray] = []
+    try:
+        written = service.write_bulk_predictions(target, count, strategy, segment, request_id, seen=seen)
+    finally:
+        if target is not sys.stdout:
+            target.close()
+    distinct = len(dedupe(np.concatenate(seen))[0]) if seen else 0
+    print(f"Generated {written} {strategy} tickets for segment '{segment}' "
+          f"({distinct} distinct combinations)", file=sys.stderr)
+
+
+def precompute_fortunes(lottery_type: str, users: int, date: str, shards: int, out_dir: str,
+                        workers: Optional[int] = None) -> Dict:
+    """Write sharded fortunes for user ids 0..users-1 plus an index, returns the index
+
+    Shards are dealt out to worker processes round-robin; a user's shard
+    is user_key(id) % shards (see fortunes.py).
+    """
+    config = LOTTERY_CONFIG[lottery_type]
+    workers = max(1, min(workers or os.cpu_count() or 1, shards))
+    groups = {f'shards-{w}': (lottery_type, date, config['main_range'], users, shards,
+                              list(range(w, shards, workers)), out_dir)
+              for w in range(workers)}
+    results = run_processes(write_fortune_shards, groups, workers)
+    errors = [r for r in results.values() if isinstance(r, Exception)]
+    if errors:
+        raise errors[0]
+
+    index = {
+        'lottery': config['name'],
+        'lottery_type': lottery_type,
+        'date': date,
+        'users': sum(results.values()),
+        'shards': shards,
+        'shard_key': 'splitmix64(user_id) % shards',
+        'files': [os.path.basename(shard_path(out_dir, s)) for s in range(shards)],
+        'generated_at': datetime.now().isoformat()
+    }
+    write_json(index, os.path.join(out_dir, 'index.json'), compress=False)
+    return index
+
+
+def print_wheel(lottery_type: str, store: HistoryStore, pool: Optional[List[int]], pool_size: int,
+                guarantee: int, if_drawn: int):
+    """Print a wheel as JSON with its ticket count on stderr"""
+    wheel = LotteryService(lottery_type, store).generate_wheel(pool, pool_size, guarantee, if_drawn)
+    print(json.dumps(wheel, indent=2))
+    print(f"{len(wheel['tickets'])} tickets guarantee {guarantee} matches if {if_drawn} of "
+          f"{len(wheel['pool'])} pool numbers are drawn (bound {wheel['lower_bound']})", file=sys.stderr)
+
+
+def print_source_health(health: SourceHealth):
+    """Table of recorded source outcomes, most recently failing first"""
+    rows = sorted(health.all(), key=lambda h: h['last_failure'] or '', reverse=True)
+    if not rows:
+        print("No source health recorded yet")
+        return
+    print(f"{'source':<44} {'ok':>5} {'fail':>5} {'rate':>5} {'latency':>8}  status")
+    for h in rows:
+        if health.is_open(h):
+            status = f"open until {h['open_until'][:16]}"
+        elif h['consecutive_failures']:
+            status = f"{h['consecutive_failures']} failing: {(h['last_error'] or '')[:60]}"
+        else:
+            status = 'ok'
+        print(f"{h['source'][:44]:<44} {h['successes']:>5} {h['failures']:>5} "
+              f"{h['success_rate']:>5.2f} {h['latency'] or 0:>7.2f}s  {status}")
 
 
 def main():
     parser = argparse.ArgumentParser(description='LottoAI Backend Service')
-    parser.add_argument('--lottery', choices=['powerball', 'mega_millions'],
+    parser.add_argument('--lottery', choices=lottery_types(),
                         help='Lottery type to process')
     parser.add_argument('--all', action='store_true', help='Process all lotteries')
     parser.add_argument('--output', default=OUTPUT_DIR, help='Output directory')
+    parser.add_argument('--history-db', default=HISTORY_DB, help='Local draw history database')
+    parser.add_argument('--backtest', action='store_true',
+                        help='Replay history and score prediction strategies instead of generating files')
+    parser.add_argument('--trials', type=int, default=200, help='Backtest tickets per strategy per draw')
+    parser.add_argument('--workers', type=int,
+                        help='Worker processes for lotteries, or per backtest (default: based on CPU count)')
+    parser.add_argument('--check-tickets', metavar='FILE',
+                        help="Check tickets ('n1 n2 n3 n4 n5 special' per line, '-' for stdin) instead of generating files")
+    parser.add_argument('--tickets-out', metavar='FILE', help='CSV results for --check-tickets (default: stdout)')
+    parser.add_argument('--draw-date', action='append', help='Draw date to check against (repeatable, default: latest)')
+    parser.add_argument('--bulk', type=int, metavar='COUNT',
+                        help='Stream COUNT personalized tickets as NDJSON instead of generating files')
+    parser.add_argument('--strategy', choices=BULK_STRATEGIES, default='hot_weighted',
+                        help='Sampling strategy for --bulk')
+    parser.add_argument('--segment', default='default', help='User segment for --bulk (part of the seed)')
+    parser.add_argument('--request-id', default='', help='Request id for --bulk (part of the seed)')
+    parser.add_argument('--bulk-out', metavar='FILE', help='NDJSON output for --bulk (default: stdout)')
+    parser.add_argument('--serve', action='store_true',
+                        help='Serve the output files from memory over HTTP instead of writing them')
+    parser.add_argument('--host', default='127.0.0.1', help='Address for --serve')
+    parser.add_argument('--port', type=int, default=8080, help='Port for --serve')
+    parser.add_argument('--refresh', type=float, default=REFRESH_INTERVAL,
+                        help='Seconds between background refreshes in --serve mode')
+    parser.add_argument('--metrics-dir', help='Where run_metrics.json and lottoai.prom go (default: next to --history-db)')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='Capture cProfile stats and tracemalloc peaks per stage into DIR')
+    parser.add_argument('--only', metavar='STAGES',
+                        help='Comma-separated pipeline stages to rebuild with their inputs, e.g. hot_cold,predictions')
+    parser.add_argument('--if-changed', action='store_true',
+                        help='Skip lotteries with no new draw since the last run (daily files still roll over)')
+    parser.add_argument('--source-health', action='store_true',
+                        help='Show the recorded health of each jackpot source and exit')
+    parser.add_argument('--fortune-user', metavar='ID', help="Print one user's daily fortune and exit")
+    parser.add_argument('--fortunes', type=int, metavar='USERS',
+                        help='Precompute sharded daily fortunes for user ids 0..USERS-1 instead of generating files')
+    parser.add_argument('--shards', type=int, default=DEFAULT_SHARDS, help='Shard files for --fortunes')
+    parser.add_argument('--fortune-date', help='Date for --fortunes/--fortune-user (default: today)')
+    parser.add_argument('--wheel', nargs='?', const='', metavar='NUMBERS',
+                        help='Print a covering wheel over comma-separated NUMBERS (default: the hot numbers) and exit')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_WHEEL[0], help='Hot numbers in a default --wheel pool')
+    parser.add_argument('--guarantee', type=int, default=DEFAULT_WHEEL[1], help='Matches guaranteed by --wheel')
+    parser.add_argument('--if-drawn', type=int, default=DEFAULT_WHEEL[2],
+                        help='Pool numbers drawn for the --wheel guarantee to hold')
+    parser.add_argument('--precompute-wheels', metavar='SIZES',
+                        help=f'Search wheels for comma-separated pool sizes ({MAIN_COUNT}-{MAX_POOL}) '
+                             'on all cores into the wheel cache and exit')
     args = parser.parse_args()
 
     output_dir = args.output
-
-    lotteries = ['powerball', 'mega_millions'] if args.all else [args.lottery] if args.lottery else ['powerball', 'mega_millions']
+    store = HistoryStore(args.history_db)
+
+    lotteries = [args.lottery] if args.lottery and not args.all else lottery_types()
+    only = [name.strip() for name in args.only.split(',') if name.strip()] if args.only else None
+    if only:
+        stages = lottery_pipeline(LotteryService(lotteries[0], store), output_dir).stages
+        unknown = [name for name in only if name not in stages]
+        if unknown:
+            parser.error(f"unknown stage {', '.join(unknown)} (choose from {', '.join(stages)})")
+
+    if args.check_tickets:
+        if not args.lottery:
+            parser.error('--check-tickets requires --lottery')
+        try:
+            check_tickets(args.lottery, store, output_dir, args.check_tickets,
+                          args.tickets_out, args.draw_date)
+        except ValueError as e:
+            parser.error(str(e))
+        return
+
+    if args.source_health:
+        print_source_health(SourceHealth(args.history_db))
+        return
+
+    if args.fortune_user or args.fortunes:
+        if not args.lottery:
+            parser.error('--fortune-user and --fortunes require --lottery')
+        date = args.fortune_date or datetime.now().strftime('%Y-%m-%d')
+        if args.fortune_user:
+            fortune = LotteryService(args.lottery, store).get_daily_fortune(args.fortune_user, date)
+            print(json.dumps(fortune, indent=2))
+            return
+        out_dir = os.path.join(output_dir, 'fortunes', args.lottery, date)
+        index = precompute_fortunes(args.lottery, args.fortunes, date, args.shards, out_dir, args.workers)
+        print(f"Wrote fortunes for {index['users']} users in {index['shards']} shards to {out_dir}")
+        return
+
+    if args.wheel is not None:
+        if not args.lottery:
+            parser.error('--wheel requires --lottery')
+        try:
+            pool = [int(n) for n in args.wheel.split(',') if n.strip()] or None
+            print_wheel(args.lottery, store, pool, args.pool_size, args.guarantee, args.if_drawn)
+        except ValueError as e:
+            parser.error(str(e))
+        return
+
+    if args.precompute_wheels:
+        cache = WheelCache(os.path.join(os.path.dirname(os.path.abspath(args.history_db)), 'wheel_cache'))
+        try:
+            sizes = [int(n) for n in args.precompute_wheels.split(',') if n.strip()]
+            if any(not MAIN_COUNT <= n <= MAX_POOL for n in sizes):
+                raise ValueError(f"Pool sizes must be {MAIN_COUNT} to {MAX_POOL}")
+        except ValueError as e:
+            parser.error(str(e))
+        precompute_wheels(cache, sizes, workers=args.workers)
+        return
+
+    if args.bulk:
+        if not args.lottery:
+            parser.error('--bulk requires --lottery')
+        try:
+            bulk_predictions(args.lottery, store, args.bulk, args.strategy,
+                             args.segment, args.request_id, args.bulk_out)
+        except ValueError as e:
+            parser.error(str(e))
+        return
 
     print(f"LottoAI Backend Service - {datetime.now().isoformat()}")
     print(f"Output directory: {output_dir}")
     print("-" * 50)
 
-    for lottery_type in lotteries:
-        print(f"\nProcessing {lottery_type}...")
-        service = LotteryService(lottery_type)
-
-        # Fetch jackpot first (may include recent results)
-        service.fetch_jackpot()
-
-        # Fetch history
-        service.fetch_history(limit=100)
-
-        # Generate all data files
-        lottery_dir = os.path.join(output_dir, lottery_type)
-
-        save_json(service.get_latest_results(),
-                  os.path.join(lottery_dir, 'latest_results.json'))
-
-        save_json(service.get_hot_cold_numbers(),
-                  os.path.join(lottery_dir, 'hot_cold_numbers.json'))
-
-        save_json(service.generate_predictions(),
-                  os.path.join(lottery_dir, 'ai_predictions.json'))
-
-        save_json(service.get_daily_fortune(),
-                  os.path.join(lottery_dir, 'daily_fortune.json'))
-
-        # New: Save jackpot info
-        save_json(service.get_jackpot_info(),
-                  os.path.join(lottery_dir, 'jackpot.json'))
+    if args.serve:
+        server = ApiServer(lambda previous: build_site(lotteries, store, output_dir, previous), args.refresh)
+        try:
+            asyncio.run(server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.backtest:
+        # Each backtest already spreads across all cores, so run lotteries one at a time
+        for lottery_type in lotteries:
+            backtest_lottery(lottery_type, store, output_dir, args.trials, args.workers)
+        return
+
+    data_dir = os.path.dirname(os.path.abspath(args.history_db))
+    metrics_dir = args.metrics_dir or data_dir
+    metrics.profile_dir = args.profile
+    state_path = os.path.join(data_dir, 'refresh_state.json')
+    state = load_state(state_path)
+    if args.if_changed:
+        with metrics.stage('plan'):
+            plans = [LotteryService(lottery_type, store).plan_refresh(state) for lottery_type in lotteries]
+        for plan in plans:
+            print(f"{plan.lottery}: {'refresh' if plan.run else 'skip'} ({plan.reason})")
+            # Spaces out remote checks across the frequent scheduled runs while a result is pending
+            plan.record(state)
+        lotteries = [plan.lottery for plan in plans if plan.run]
+        if not lotteries:
+            print("Nothing changed, skipping regeneration")
+            save_state(state, state_path)
+            metrics.write(metrics_dir)
+            return
+
+    # Lotteries are independent; a process pool overlaps their network waits and spreads the analysis
+    if len(lotteries) == 1:
+        results = run_parallel({lotteries[0]: lambda: process_lottery(lotteries[0], store, output_dir,
+                                                                      args.profile, only)})
+    else:
+        results = run_processes(process_lottery, {lt: (lt, store, output_dir, args.profile, only)
+                                                  for lt in lotteries}, args.workers)
+    # Keep the previous history index for any lottery that failed this run
+    history = (load_json(os.path.join(output_dir, 'manifest.json')) or {}).get('history', {})
+    for lottery_type, result in results.items():
+        if isinstance(result, Exception):
+            print(f"Error processing {lottery_type}: {result}")
+            metrics.merge(getattr(result, 'metrics', {}))
+        else:
+            index, records = result
+            metrics.merge(records)
+            if index is not None:
+                history[lottery_type] = index
+            if only:
+                # A partial rebuild doesn't publish everything the refresh planner tracks
+                continue
+            state[lottery_type] = {
+                'checkpoint': store.get_checkpoint(lottery_type),
+                'generated_on': datetime.now().strftime('%Y-%m-%d'),
+                'next_draw': next_draw_date(LOTTERY_CONFIG[lottery_type]['draw_days'], datetime.now())
+            }
+    save_state(state, state_path)
 
     # Generate common files
-    save_json(generate_quotes(), os.path.join(output_dir, 'daily_quotes.json'))
-    save_json(generate_manifest(), os.path.join(output_dir, 'manifest.json'))
+    with metrics.stage('common_files'):
+        save_json(generate_quotes(), os.path.join(output_dir, 'daily_quotes.json'))
+        save_json(generate_manifest(history), os.path.join(output_dir, 'manifest.json'))
+
+    metrics.write(metrics_dir)
+    slowest = sorted(metrics.stages, key=lambda s: s['seconds'], reverse=True)[:3]
+    print("Slowest stages: " + ', '.join(f"{s['lottery']}/{s['stage']} {s['seconds']:.2f}s" for s in slowest))
+    print(f"Metrics: {os.path.join(metrics_dir, 'run_metrics.json')}")
 
     print("\n" + "=" * 50)
     print("All data files generated successfully!")
@@ -0,0 +1,86 @@
+"""
+LottoAI Output Writer
+Atomic JSON writes that skip unchanged content and emit precompressed siblings
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # .json.br siblings are skipped without the brotli package
+    brotli = None
+
+# Top-level fields that change on every run without the data changing
+VOLATILE_FIELDS = ('last_updated', 'generated_at')
+
+# Precompressed sibling extensions; mtime=0 keeps gzip bytes stable for identical content
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {
+    '.gz': lambda payload: gzip.compress(payload, compresslevel=9, mtime=0),
+}
+if brotli is not None:
+    COMPRESSORS['.br'] = lambda payload: brotli.compress(payload, quality=11)
+
+
+def content_hash(data: Any) -> str:
+    """Hash of the data ignoring volatile timestamp fields"""
+    if isinstance(data, dict):
+        data = {k: v for k, v in data.items() if k not in VOLATILE_FIELDS}
+    canonical = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _existing_hash(filepath: str) -> Optional[str]:
+    try:
+        with open(filepath, encoding='utf-8') as f:
+            return content_hash(json.load(f))
+    except (OSError, ValueError):
+        return None
+
+
+def atomic_write(filepath: str, payload: bytes):
+    """Replace filepath with payload via a temp file and rename"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(filepath), prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, filepath)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _write_siblings(data: Any, filepath: str, extensions):
+    compact = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    for ext in extensions:
+        atomic_write(filepath + ext, COMPRESSORS[ext](compact))
+
+
+def write_json(data: Any, filepath: str, compress: bool = True) -> bool:
+    """Write data as JSON unless only volatile fields changed, returns True if written
+
+    The file is replaced atomically (temp file + rename). With `compress`,
+    compact .json.gz (and .json.br when brotli is installed) siblings are
+    written alongside, and restored if missing even when the JSON is unchanged.
+    """
+    os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+    unchanged = _existing_hash(filepath) == content_hash(data)
+
+    if unchanged:
+        missing = [ext for ext in COMPRESSORS if not os.path.exists(filepath + ext)] if compress else []
+        if missing:
+            # Compress what is on disk so siblings keep matching the JSON's timestamps
+            with open(filepath, encoding='utf-8') as f:
+                _write_siblings(json.load(f), filepath, missing)
+        return False
+
+    atomic_write(filepath, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+    if compress:
+        _write_siblings(data, filepath, COMPRESSORS)
+    return True
@@ -0,0 +1,107 @@
+"""
+LottoAI Pipeline
+Stages with declared inputs, run concurrently as soon as their inputs are done
+"""
+
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional
+
+
+class Stage:
+    """A named step; `fn` runs once every stage in `inputs` has finished
+
+    Stages share state through the object they close over (e.g. the
+    LotteryService), so `inputs` only orders them; each stage's return
+    value is kept in the run's results.
+    """
+
+    def __init__(self, name: str, fn: Callable[[], Any], inputs: Iterable[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name} <- {', '.join(self.inputs) or 'nothing'})"
+
+
+class Pipeline:
+    """Dependency graph of stages"""
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            unknown = [name for name in stage.inputs if name not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown {', '.join(unknown)}")
+        self.order = self._topological(list(self.stages))
+
+    def _topological(self, names: List[str]) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Stage cycle: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dependency in self.stages[name].inputs:
+                visit(dependency, path + [name])
+            state[name] = 'done'
+            order.append(name)
+
+        for name in names:
+            visit(name, [])
+        return order
+
+    def closure(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """Targets plus everything they depend on, in dependency order (all stages by default)"""
+        if targets is None:
+            return list(self.order)
+        targets = list(targets)
+        unknown = [name for name in targets if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage {', '.join(unknown)}; choose from {', '.join(self.order)}")
+        return self._topological(targets)
+
+    def run(self, targets: Optional[Iterable[str]] = None, done: Optional[Dict[str, Any]] = None,
+            max_workers: Optional[int] = None,
+            around: Optional[Callable[[str], ContextManager]] = None) -> Dict[str, Any]:
+        """Run `targets` and their inputs, returns {stage: result}
+
+        Stages in `done` are treated as finished with the given results.
+        `around(name)` wraps each stage (e.g. a timer). The first failure
+        stops new stages from starting; it is raised once running ones end.
+        """
+        results: Dict[str, Any] = dict(done or {})
+        todo = [name for name in self.closure(targets) if name not in results]
+        if not todo:
+            return results
+
+        def call(name: str) -> Any:
+            with (around(name) if around else nullcontext()):
+                return self.stages[name].fn()
+
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+        with ThreadPoolExecutor(max_workers=max_workers or len(todo)) as executor:
+            while todo or running:
+                if error is None:
+                    ready = [name for name in todo if all(i in results for i in self.stages[name].inputs)]
+                    for name in ready:
+                        todo.remove(name)
+                        running[executor.submit(contextvars.copy_context().run, call, name)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        error = error or e
+        if error is not None:
+            raise error
+        return results
@@ -0,0 +1,128 @@
+"""
+LottoAI Refresh Planner
+Decides from the draw schedule whether a run has anything new to publish
+"""
+
+import os
+import json
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from output_writer import atomic_write
+
+# Hour after which today's draw counts as held (matches the next-draw cutoff)
+DRAW_HOUR = 23
+# How long after a draw its result is polled for eagerly before falling back to the idle rate
+RESULT_GRACE = timedelta(hours=48)
+# Seconds until the remote is asked again while a result is pending, and once it is overdue
+POLL_PENDING = 10 * 60
+POLL_IDLE = 4 * 60 * 60
+
+
+def next_draw_date(draw_days: List[str], now: datetime) -> str:
+    """Next draw date (YYYY-MM-DD), today until the draw hour on a draw day"""
+    for i in range(7):
+        check_date = now + timedelta(days=i)
+        if check_date.strftime('%A') in draw_days:
+            if i == 0 and now.hour >= DRAW_HOUR:
+                continue
+            return check_date.strftime('%Y-%m-%d')
+
+    return (now + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def last_draw_date(draw_days: List[str], now: datetime) -> Optional[str]:
+    """Most recent draw date that has already been held"""
+    for i in range(8):
+        check_date = now - timedelta(days=i)
+        if check_date.strftime('%A') in draw_days and (i > 0 or now.hour >= DRAW_HOUR):
+            return check_date.strftime('%Y-%m-%d')
+    return None
+
+
+class RefreshPlan:
+    """Whether one lottery needs regenerating, and when to check again
+
+    `waiting_for` is the held draw whose result is missing, if any; while
+    it stays missing the remote is not asked again for `poll_after` seconds.
+    """
+
+    def __init__(self, lottery: str, run: bool, reason: str, poll_after: int = POLL_IDLE,
+                 waiting_for: Optional[str] = None):
+        self.lottery = lottery
+        self.run = run
+        self.reason = reason
+        self.poll_after = poll_after
+        self.waiting_for = waiting_for
+
+    def record(self, state: Dict, now: Optional[datetime] = None):
+        """Note in `state` when a skipped lottery waiting for a result may ask the remote again"""
+        if self.run or not self.waiting_for:
+            return
+        now = now or datetime.now()
+        state[self.lottery] = {
+            **(state.get(self.lottery) or {}),
+            'waiting_for': self.waiting_for,
+            'next_check': (now + timedelta(seconds=self.poll_after)).isoformat(timespec='seconds')
+        }
+
+    def __repr__(self) -> str:
+        return f"RefreshPlan({self.lottery}: {'run' if self.run else 'skip'}, {self.reason})"
+
+
+def plan_refresh(lottery: str, draw_days: List[str], checkpoint: Optional[str], state: Dict,
+                 latest_remote: Callable[[], Optional[str]], now: Optional[datetime] = None) -> RefreshPlan:
+    """Plan one lottery's run from its stored checkpoint and last published state
+
+    Daily files (fortune, next draw) roll over once per day; otherwise a run
+    is only needed when a draw newer than the checkpoint exists. The remote
+    is asked (one lightweight call to `latest_remote`) only while a held
+    draw's result is still missing from the store, and no sooner than the
+    `next_check` a previous plan recorded for that draw (see RefreshPlan.record).
+    """
+    now = now or datetime.now()
+    today = now.strftime('%Y-%m-%d')
+    previous = state.get(lottery) or {}
+
+    if not checkpoint:
+        return RefreshPlan(lottery, True, 'no stored history', POLL_PENDING)
+    if previous.get('generated_on') != today:
+        return RefreshPlan(lottery, True, f"daily files are from {previous.get('generated_on') or 'never'}")
+    if previous.get('next_draw') != next_draw_date(draw_days, now):
+        return RefreshPlan(lottery, True, f"next draw moved to {next_draw_date(draw_days, now)}")
+    if (previous.get('checkpoint') or '') < checkpoint:
+        return RefreshPlan(lottery, True, f"store has {checkpoint} beyond published {previous.get('checkpoint')}")
+
+    expected = last_draw_date(draw_days, now)
+    if not expected or checkpoint >= expected:
+        return RefreshPlan(lottery, False, f"up to date with the {checkpoint} draw")
+
+    next_check = previous.get('next_check') if previous.get('waiting_for') == expected else None
+    if next_check and now < datetime.fromisoformat(next_check):
+        return RefreshPlan(lottery, False, f"waiting for the {expected} result, next check at {next_check}",
+                           int((datetime.fromisoformat(next_check) - now).total_seconds()), expected)
+
+    try:
+        remote = latest_remote()
+    except Exception as e:
+        return RefreshPlan(lottery, False, f"latest draw check failed: {e}", POLL_PENDING, expected)
+    if remote and remote > checkpoint:
+        return RefreshPlan(lottery, True, f"new draw {remote}")
+
+    held_at = datetime.strptime(expected, '%Y-%m-%d') + timedelta(hours=DRAW_HOUR)
+    poll_after = POLL_PENDING if now - held_at < RESULT_GRACE else POLL_IDLE
+    return RefreshPlan(lottery, False, f"waiting for the {expected} result", poll_after, expected)
+
+
+def load_state(path: str) -> Dict:
+    """Per-lottery record of what the last successful run published"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: Dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    atomic_write(path, json.dumps(state, indent=2, sort_keys=True).encode('utf-8'))
@@ -0,0 +1,218 @@
+"""
+LottoAI Run Metrics
+Per-stage timings and per-request HTTP stats, written as JSON and a Prometheus textfile
+"""
+
+import os
+import time
+import cProfile
+import contextvars
+import threading
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from output_writer import atomic_write, write_json
+
+# Lottery label for stages and requests outside any lottery (quotes, manifest)
+GLOBAL = 'all'
+
+# Lottery the current thread works for; fetch_pool, pipeline and history_ingest
+# run their tasks in a copy of the submitting context so it follows the work
+CURRENT_LOTTERY: contextvars.ContextVar = contextvars.ContextVar('lottery', default=GLOBAL)
+
+
+class RunMetrics:
+    """Thread-safe collector for one process
+
+    Requests are attributed to the lottery set with `lottery()` in the
+    calling context (see CURRENT_LOTTERY), so concurrent lotteries in one
+    process don't mix; worker
+    processes handle one lottery at a time, so `pop()` hands that lottery's
+    records back to the parent, which `merge()`s them.
+    """
+
+    def __init__(self, profile_dir: Optional[str] = None):
+        self.profile_dir = profile_dir
+        self.started_at = datetime.now().isoformat()
+        self.started = time.perf_counter()
+        self.stages: List[Dict] = []
+        self.requests: List[Dict] = []
+        self.sources: Dict[str, Dict[str, str]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    @property
+    def current_lottery(self) -> str:
+        return CURRENT_LOTTERY.get()
+
+    @contextmanager
+    def lottery(self, lottery: str) -> Iterator[None]:
+        token = CURRENT_LOTTERY.set(lottery)
+        try:
+            yield
+        finally:
+            CURRENT_LOTTERY.reset(token)
+
+    def reset(self):
+        """Drop all records and restart the clock, e.g. before each serve-mode refresh"""
+        with self._lock:
+            self.started_at = datetime.now().isoformat()
+            self.started = time.perf_counter()
+            self.stages = []
+            self.requests = []
+            self.sources = defaultdict(dict)
+
+    @contextmanager
+    def stage(self, name: str, lottery: Optional[str] = None) -> Iterator[None]:
+        """Time a block; with profile_dir, also cProfile it and track its peak allocation
+
+        cProfile only sees the calling thread, so work handed to fetch
+        threads shows up as waiting time.
+        """
+        record = {'lottery': lottery or self.current_lottery, 'stage': name, 'ok': True}
+        profiler = None
+        tracing = False
+        if self.profile_dir:
+            profiler = cProfile.Profile()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                tracing = True
+            tracemalloc.reset_peak()
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            record.update(ok=False, error=str(e))
+            raise
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 6)
+            if profiler:
+                profiler.disable()
+                record['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                if tracing:
+                    tracemalloc.stop()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir, f"{record['lottery']}.{name}.prof")
+                profiler.dump_stats(path)
+                record['profile'] = path
+            with self._lock:
+                self.stages.append(record)
+
+    def record_request(self, event: Dict):
+        """HttpClient observer: url, status, bytes, seconds and error of one request"""
+        event = {**event, 'lottery': self.current_lottery, 'host': urlsplit(event['url']).netloc}
+        with self._lock:
+            self.requests.append(event)
+
+    def record_source(self, kind: str, source: Optional[str], lottery: Optional[str] = None):
+        """Which fallback source answered, e.g. record_source('jackpot', 'lottery.net')"""
+        with self._lock:
+            self.sources[lottery or self.current_lottery][kind] = source
+
+    def pop(self, lottery: str) -> Dict:
+        """Remove and return one lottery's records"""
+        with self._lock:
+            records = {
+                'stages': [s for s in self.stages if s['lottery'] == lottery],
+                'requests': [r for r in self.requests if r['lottery'] == lottery],
+                'sources': {lottery: self.sources.pop(lottery, {})}
+            }
+            self.stages = [s for s in self.stages if s['lottery'] != lottery]
+            self.requests = [r for r in self.requests if r['lottery'] != lottery]
+        return records
+
+    def merge(self, records: Dict):
+        with self._lock:
+            self.stages.extend(records.get('stages', []))
+            self.requests.extend(records.get('requests', []))
+            for lottery, sources in records.get('sources', {}).items():
+                self.sources[lottery].update(sources)
+
+    def summary(self) -> Dict:
+        """Totals per lottery stage and per host"""
+        hosts: Dict[str, Dict] = defaultdict(lambda: {'requests': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0,
+                                                        'not_modified': 0})
+        for r in self.requests:
+            host = hosts[r['host']]
+            host['requests'] += 1
+            host['bytes'] += r.get('bytes') or 0
+            host['seconds'] = round(host['seconds'] + r['seconds'], 6)
+            host['errors'] += 1 if r.get('error') or (r.get('status') or 0) >= 400 else 0
+            host['not_modified'] += 1 if r.get('status') == 304 else 0
+
+        lotteries: Dict[str, Dict] = defaultdict(dict)
+        for s in self.stages:
+            lotteries[s['lottery']][s['stage']] = s['seconds']
+        return {'lotteries': dict(lotteries), 'hosts': dict(hosts)}
+
+    def to_dict(self) -> Dict:
+        return {
+            'started_at': self.started_at,
+            'duration_seconds': round(time.perf_counter() - self.started, 6),
+            'summary': self.summary(),
+            'sources': dict(self.sources),
+            'stages': self.stages,
+            'requests': self.requests
+        }
+
+    def write(self, directory: str):
+        """Write run_metrics.json and lottoai.prom into directory"""
+        data = self.to_dict()
+        write_json(data, os.path.join(directory, 'run_metrics.json'), compress=False)
+        atomic_write(os.path.join(directory, 'lottoai.prom'), self.prometheus(data).encode('utf-8'))
+
+    @staticmethod
+    def prometheus(data: Dict) -> str:
+        """Prometheus text exposition format, for node_exporter's textfile collector"""
+        def label(value: object) -> str:
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        lines = [
+            '# HELP lottoai_run_duration_seconds Wall time of the last run.',
+            '# TYPE lottoai_run_duration_seconds gauge',
+            f"lottoai_run_duration_seconds {data['duration_seconds']}",
+            '# HELP lottoai_run_timestamp_seconds Unix time the last run finished.',
+            '# TYPE lottoai_run_timestamp_seconds gauge',
+            f'lottoai_run_timestamp_seconds {int(time.time())}',
+            '# HELP lottoai_stage_duration_seconds Wall time per lottery stage.',
+            '# TYPE lottoai_stage_duration_seconds gauge',
+        ]
+        for s in data['stages']:
+            lines.append(f'lottoai_stage_duration_seconds{{lottery="{label(s["lottery"])}",'
+                         f'stage="{label(s["stage"])}"}} {s["seconds"]}')
+        lines += ['# HELP lottoai_stage_success Whether the stage completed (1) or raised (0).',
+                  '# TYPE lottoai_stage_success gauge']
+        for s in data['stages']:
+            lines.append(f'lottoai_stage_success{{lottery="{label(s["lottery"])}",'
+                         f'stage="{label(s["stage"])}"}} {int(s["ok"])}')
+        if any('peak_bytes' in s for s in data['stages']):
+            lines += ['# HELP lottoai_stage_peak_bytes Peak traced allocation per stage (--profile).',
+                      '# TYPE lottoai_stage_peak_bytes gauge']
+            for s in data['stages']:
+                if 'peak_bytes' in s:
+                    lines.append(f'lottoai_stage_peak_bytes{{lottery="{label(s["lottery"])}",'
+                                 f'stage="{label(s["stage"])}"}} {s["peak_bytes"]}')
+
+        host_metrics = [
+            ('lottoai_http_requests', 'requests', 'HTTP requests per host in the last run.'),
+            ('lottoai_http_errors', 'errors', 'Failed HTTP requests per host in the last run.'),
+            ('lottoai_http_not_modified', 'not_modified', '304 responses per host in the last run.'),
+            ('lottoai_http_response_bytes', 'bytes', 'Response bytes per host in the last run.'),
+            ('lottoai_http_request_seconds', 'seconds', 'Summed request latency per host in the last run.'),
+        ]
+        for metric, field, help_text in host_metrics:
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+            for host, stats in sorted(data['summary']['hosts'].items()):
+                lines.append(f'{metric}{{host="{label(host)}"}} {stats[field]}')
+
+        lines += ['# HELP lottoai_source_info Fallback source that answered, per lottery and kind.',
+                  '# TYPE lottoai_source_info gauge']
+        for lottery, sources in sorted(data['sources'].items()):
+            for kind, source in sorted(sources.items()):
+                lines.append(f'lottoai_source_info{{lottery="{label(lottery)}",kind="{label(kind)}",'
+                             f'source="{label(source or "none")}"}} 1')
+        return '\n'.join(lines) + '\n'
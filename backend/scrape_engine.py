@@ -0,0 +1,110 @@
+"""
+LottoAI Scrape Engine
+Declarative single-pass HTML scraping over a streamed response, with early exit
+"""
+
+import re
+import codecs
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Longest text a single pattern may match; patterns must use bounded repeats
+MAX_MATCH = 512
+
+
+class Field:
+    """A value to extract, with patterns in priority order
+
+    Every pattern marks its value with one `(?P<value>...)` group. A field
+    with `limit` 1 takes the match of its highest-priority pattern; larger
+    limits collect matches in page order.
+    """
+
+    def __init__(self, name: str, patterns: List[str], limit: int = 1,
+                 convert: Optional[Callable[[str], object]] = None):
+        self.name = name
+        self.patterns = patterns
+        self.limit = limit
+        self.convert = convert or (lambda value: value)
+
+
+class ScrapeSpec:
+    """Compiles all fields into one lookahead alternation scanned once per position
+
+    At any position only the first alternative that matches is reported, so
+    fields should not have patterns that can start on the same character.
+    """
+
+    def __init__(self, fields: List[Field], flags: int = re.IGNORECASE):
+        self.fields = fields
+        alternatives = []
+        self._groups: Dict[str, tuple] = {}
+        for f in fields:
+            for priority, pattern in enumerate(f.patterns):
+                group = f'{f.name}__{priority}'
+                if pattern.count('(?P<value>') != 1:
+                    raise ValueError(f"Pattern for {f.name} needs exactly one value group")
+                alternatives.append('(?=' + pattern.replace('(?P<value>', f'(?P<{group}>') + ')')
+                self._groups[group] = (f, priority)
+        self.regex = re.compile('|'.join(alternatives), flags)
+
+    def scan(self, chunks: Iterable[str]) -> Dict[str, object]:
+        """Scan streamed text and return {field: value or list}
+
+        Reading stops as soon as every single-value field has its top
+        priority match and every list field is full, so the rest of the
+        page is never downloaded.
+        """
+        best: Dict[str, tuple] = {}
+        found: Dict[str, List] = {f.name: [] for f in self.fields if f.limit > 1}
+        # List fields take non-overlapping matches like re.findall; offsets are absolute
+        resume_at: Dict[str, int] = {name: 0 for name in found}
+        buffer = ''
+        base = 0
+
+        def scan_until(end: int):
+            for match in self.regex.finditer(buffer):
+                if match.start() >= end:
+                    break
+                group = match.lastgroup
+                f, priority = self._groups[group]
+                if f.limit > 1:
+                    start = base + match.start()
+                    if len(found[f.name]) < f.limit and start >= resume_at[f.name]:
+                        found[f.name].append(f.convert(match.group(group)))
+                        resume_at[f.name] = base + match.end(group)
+                elif f.name not in best or priority < best[f.name][0]:
+                    best[f.name] = (priority, f.convert(match.group(group)))
+
+        def done() -> bool:
+            return all(
+                len(found[f.name]) >= f.limit if f.limit > 1 else best.get(f.name, (1,))[0] == 0
+                for f in self.fields
+            )
+
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) <= MAX_MATCH:
+                continue
+            # Positions before `end` have MAX_MATCH characters of context, so their matches are final
+            end = len(buffer) - MAX_MATCH
+            scan_until(end)
+            buffer = buffer[end:]
+            base += end
+            if done():
+                break
+        else:
+            scan_until(len(buffer))
+
+        result: Dict[str, object] = {name: values for name, values in found.items()}
+        for f in self.fields:
+            if f.limit == 1:
+                result[f.name] = best[f.name][1] if f.name in best else None
+        return result
+
+
+def iter_text(response, chunk_size: int = 8192) -> Iterable[str]:
+    """Decode a streamed requests response into text chunks"""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
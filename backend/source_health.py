@@ -0,0 +1,165 @@
+"""
+LottoAI Source Health
+Per-source success and latency history that reorders fallback chains and trips a circuit breaker
+"""
+
+import os
+import time
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fetch_pool import Source
+from history_store import HISTORY_DB
+
+# Weight of the newest outcome in the smoothed success rate and latency
+SMOOTHING = 0.3
+# Sources below this smoothed success rate, or slower than SLOW_SECONDS, move behind healthy ones
+MIN_SUCCESS_RATE = 0.5
+SLOW_SECONDS = 3.0
+# A degraded source that hasn't been tried for this long gets its declared priority back for one attempt
+RETRY_AFTER = timedelta(hours=6)
+# Consecutive failures that open the circuit, and how long it stays open (doubling per further failure)
+FAILURE_THRESHOLD = 3
+OPEN_BASE = timedelta(minutes=30)
+OPEN_MAX = timedelta(hours=24)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_health (
+    source TEXT PRIMARY KEY,
+    successes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0,
+    success_rate REAL NOT NULL DEFAULT 1.0,
+    latency REAL,
+    last_success TEXT,
+    last_failure TEXT,
+    last_error TEXT,
+    open_until TEXT
+);
+"""
+
+
+class SourceHealth:
+    """Health records keyed by source, kept in the history database
+
+    Outcomes are written as they happen, so lottery worker processes can
+    share one database file.
+    """
+
+    def __init__(self, path: str = HISTORY_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, source: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM source_health WHERE source = ?', (source,)).fetchone()
+        return dict(row) if row else None
+
+    def all(self) -> List[Dict]:
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute('SELECT * FROM source_health ORDER BY source')]
+
+    def record(self, source: str, ok: bool, seconds: float, error: Optional[str] = None):
+        """Fold one outcome into the source's smoothed rate and latency"""
+        now = datetime.now()
+        with self._connect() as conn:
+            # Take the write lock before reading so concurrent processes don't lose updates
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT * FROM source_health WHERE source = ?', (source,)).fetchone()
+            health = dict(row) if row else {'successes': 0, 'failures': 0, 'consecutive_failures': 0,
+                                            'success_rate': 1.0, 'latency': None, 'last_success': None,
+                                            'last_failure': None, 'last_error': None, 'open_until': None}
+            health['success_rate'] += SMOOTHING * ((1.0 if ok else 0.0) - health['success_rate'])
+            if health['latency'] is None:
+                health['latency'] = seconds
+            else:
+                health['latency'] += SMOOTHING * (seconds - health['latency'])
+
+            if ok:
+                health.update(successes=health['successes'] + 1, consecutive_failures=0,
+                              last_success=now.isoformat(), open_until=None)
+            else:
+                failures = health['consecutive_failures'] + 1
+                health.update(failures=health['failures'] + 1, consecutive_failures=failures,
+                              last_failure=now.isoformat(), last_error=error)
+                if failures >= FAILURE_THRESHOLD:
+                    open_for = min(OPEN_BASE * 2 ** (failures - FAILURE_THRESHOLD), OPEN_MAX)
+                    health['open_until'] = (now + open_for).isoformat()
+
+            conn.execute(
+                'INSERT OR REPLACE INTO source_health (source, successes, failures, consecutive_failures, '
+                'success_rate, latency, last_success, last_failure, last_error, open_until) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (source, health['successes'], health['failures'], health['consecutive_failures'],
+                 round(health['success_rate'], 4), round(health['latency'], 4), health['last_success'],
+                 health['last_failure'], health['last_error'], health['open_until'])
+            )
+
+    @staticmethod
+    def is_open(health: Optional[Dict], now: Optional[datetime] = None) -> bool:
+        """Whether the circuit is open; once open_until passes the next attempt is a trial"""
+        if not health or not health.get('open_until'):
+            return False
+        return (now or datetime.now()).isoformat() < health['open_until']
+
+    @staticmethod
+    def is_degraded(health: Optional[Dict], now: Optional[datetime] = None) -> bool:
+        if not health:
+            return False
+        last_tried = max(health['last_success'] or '', health['last_failure'] or '')
+        if last_tried < ((now or datetime.now()) - RETRY_AFTER).isoformat():
+            return False
+        return (health['success_rate'] < MIN_SUCCESS_RATE
+                or (health['latency'] or 0) > SLOW_SECONDS)
+
+    def order(self, sources: List[Source], keys: List[str]) -> Tuple[List[Source], List[str]]:
+        """Arrange a fallback chain by health, returns (sources to try, keys skipped)
+
+        Healthy sources keep their declared priority, degraded ones follow
+        in order of success rate. Sources with an open circuit are left out
+        unless every source is open, in which case the chain is unchanged.
+        """
+        health = {key: self.get(key) for key in keys}
+        now = datetime.now()
+        ranked = [(source, key) for source, key in zip(sources, keys) if not self.is_open(health[key], now)]
+        if not ranked:
+            return list(sources), []
+        skipped = [key for key in keys if self.is_open(health[key], now)]
+
+        def rank(item: Tuple[int, Tuple[Source, str]]) -> Tuple:
+            position, (_, key) = item
+            if not self.is_degraded(health[key], now):
+                return (0, 0.0, position)
+            return (1, -health[key]['success_rate'], position)
+
+        ranked = [item for _, item in sorted(enumerate(ranked), key=rank)]
+        return [source for source, _ in ranked], skipped
+
+    def track(self, key: str, fn: Callable[[float], Any],
+              accept: Callable[[Any], bool] = lambda result: True) -> Callable[[float], Any]:
+        """Wrap a fetcher so its outcome and latency are recorded under `key`"""
+        def tracked(timeout: float) -> Any:
+            start = time.perf_counter()
+            try:
+                result = fn(timeout)
+            except Exception as e:
+                self.record(key, False, time.perf_counter() - start, str(e)[:200])
+                raise
+            ok = accept(result)
+            self.record(key, ok, time.perf_counter() - start, None if ok else 'no usable result')
+            return result
+        return tracked
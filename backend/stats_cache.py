@@ -0,0 +1,96 @@
+"""
+LottoAI Stats Cache
+On-disk LRU memo of derived analytics keyed by a fingerprint of the history they came from
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+# Default location of cached analytics
+STATS_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'stats_cache')
+# Entries kept on disk; the least recently used beyond this are evicted
+MAX_ENTRIES = 256
+# Bump when an analysis changes its output so stale entries stop matching
+CACHE_VERSION = 1
+
+
+def history_fingerprint(history: List[Dict], config: Dict) -> str:
+    """Content hash of the draws (date, numbers, special) and the game's number ranges"""
+    digest = hashlib.sha256(json.dumps(
+        [CACHE_VERSION, config['main_range'], config['special_range']]).encode('utf-8'))
+    digest.update(''.join([f"{d['date']}|{d['numbers']}|{d['special']}\n" for d in history]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class StatsCache:
+    """JSON results by (analysis, fingerprint, parameters); file mtimes track recency"""
+
+    def __init__(self, cache_dir: Optional[str] = STATS_CACHE_DIR, max_entries: int = MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _key(analysis: str, fingerprint: str, params: Any) -> str:
+        raw = json.dumps([analysis, fingerprint, params], sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get_or_compute(self, analysis: str, fingerprint: str, params: Any, compute: Callable[[], Any]) -> Any:
+        """Cached result of `compute` for this history, computing and storing it on a miss
+
+        Results go through JSON either way, so hits and misses return the
+        same shapes (tuples come back as lists, keys as strings).
+        """
+        if not self.cache_dir:
+            return compute()
+        path = os.path.join(self.cache_dir, f'{self._key(analysis, fingerprint, params)}.json')
+        try:
+            with open(path, encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)
+            self.hits += 1
+            return result
+        except (OSError, ValueError):
+            pass
+
+        self.misses += 1
+        result = json.loads(json.dumps(compute()))
+        self._save(path, result)
+        return result
+
+    def _save(self, path: str, result: Any):
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"  Stats cache write error: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._evict()
+
+    def _evict(self):
+        """Drop the least recently used entries beyond max_entries"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json'):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except OSError:
+                    continue
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
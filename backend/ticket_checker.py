@@ -0,0 +1,146 @@
+"""
+LottoAI Ticket Checker
+Bulk prize checking with tickets encoded as 128-bit number bitmasks
+"""
+
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+# Default number of tickets decoded and checked per batch
+CHUNK_SIZE = 200_000
+
+NO_PRIZE = 'No prize'
+INVALID = 'Invalid ticket'
+
+
+def encode_main(main: np.ndarray) -> np.ndarray:
+    """Encode (N, 5) main numbers as (N, 2) uint64 words, bit n set for number n"""
+    main = np.asarray(main, dtype=np.uint64)
+    words = np.zeros((main.shape[0], 2), dtype=np.uint64)
+    low = main < 64
+    one = np.uint64(1)
+    # Numbers are distinct per valid ticket, so OR-reduction equals summing the bits
+    np.bitwise_or.reduce(np.where(low, one << np.where(low, main, 0), 0), axis=1, out=words[:, 0])
+    np.bitwise_or.reduce(np.where(~low, one << np.where(~low, main - 64, 0), 0), axis=1, out=words[:, 1])
+    return words
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Set bits per row of a (..., 2) uint64 mask array"""
+    return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+
+
+class TicketChecker:
+    """Matches ticket batches against one or more draws with vectorized popcount"""
+
+    def __init__(self, draws: List[Dict], prize_tiers: Sequence[Tuple[int, int, str]],
+                 main_range: Tuple[int, int], special_range: Tuple[int, int]):
+        if not draws:
+            raise ValueError("No draws to check tickets against")
+        self.draws = draws
+        self.main_range = main_range
+        self.special_range = special_range
+        self.draw_masks = encode_main(np.array([d['numbers'][:5] for d in draws]))
+        self.draw_specials = np.array([d['special'] for d in draws], dtype=np.int64)
+
+        # tier_index[matches, special_hit] -> position in tier_names
+        self.tier_names = [NO_PRIZE] + [name for _, _, name in prize_tiers] + [INVALID]
+        self.tier_index = np.zeros((6, 2), dtype=np.int8)
+        for i, (matches, special, _) in enumerate(prize_tiers, start=1):
+            self.tier_index[matches, special] = i
+        self.invalid_tier = len(self.tier_names) - 1
+
+    def check(self, main: np.ndarray, special: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Match a batch against every draw
+
+        Returns (matches, special_hit, tier), each shaped (tickets, draws).
+        """
+        in_range = (main >= self.main_range[0]).all(axis=1) & (main <= self.main_range[1]).all(axis=1)
+        masks = encode_main(np.where(in_range[:, None], main, self.main_range[0]))
+        valid = (in_range & (popcount(masks) == 5)
+                 & (special >= self.special_range[0]) & (special <= self.special_range[1]))
+
+        matches = popcount(masks[:, None, :] & self.draw_masks[None, :, :])
+        special_hit = (special[:, None] == self.draw_specials[None, :]).astype(np.intp)
+        tier = self.tier_index[matches, special_hit]
+        tier[~valid] = self.invalid_tier
+        return matches, special_hit, tier
+
+    def check_stream(self, lines: Iterator[str], out: TextIO, chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+        """Check tickets from text lines and stream CSV results, returns tier counts"""
+        counts = np.zeros(len(self.tier_names), dtype=np.int64)
+        dates = [d['date'] for d in self.draws]
+        out.write('ticket,draw_date,matches,special_match,prize\n')
+
+        for ids, main, special in read_tickets(lines, chunk_size):
+            matches, special_hit, tier = self.check(main, special)
+            counts += np.bincount(tier.ravel(), minlength=len(counts))
+            # tolist() once per batch keeps the formatting loop on plain ints
+            m, h, t = matches.tolist(), special_hit.tolist(), tier.tolist()
+            out.writelines(
+                f"{ids[i]},{date},{m[i][d]},{h[i][d]},{self.tier_names[t[i][d]]}\n"
+                for i in range(len(ids)) for d, date in enumerate(dates)
+            )
+
+        return {name: int(c) for name, c in zip(self.tier_names, counts) if c}
+
+
+def read_tickets(lines: Iterator[str], chunk_size: int = CHUNK_SIZE
+                 ) -> Iterator[Tuple[List[str], np.ndarray, np.ndarray]]:
+    """Decode ticket lines in bounded batches
+
+    Each line is `n1 n2 n3 n4 n5 special`, comma or space separated,
+    optionally prefixed by a ticket id. Blank lines and `#` comments are
+    skipped; tickets without an id are numbered by line.
+    """
+    ids: List[str] = []
+    rows: List[List[str]] = []
+    line_no = 0
+
+    for line in lines:
+        line_no += 1
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        fields = line.replace(',', ' ').split()
+        if len(fields) == 7:
+            ids.append(fields[0])
+            fields = fields[1:]
+        elif len(fields) == 6:
+            ids.append(str(line_no))
+        else:
+            print(f"  Skipping malformed ticket on line {line_no}", file=sys.stderr)
+            continue
+        rows.append(fields)
+
+        if len(rows) >= chunk_size:
+            yield _decode(ids, rows)
+            ids, rows = [], []
+
+    if rows:
+        yield _decode(ids, rows)
+
+
+def _decode(ids: List[str], rows: List[List[str]]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    try:
+        values = np.array(rows, dtype=np.int64)
+    except ValueError:
+        # Non-numeric fields somewhere in the batch, decode row by row and flag bad ones
+        values = np.array([[int(v) if v.isdigit() else -1 for v in row] for row in rows], dtype=np.int64)
+    return ids, values[:, :5], values[:, 5]
+
+
+def check_ticket_file(checker: TicketChecker, path: str, out_path: Optional[str] = None,
+                      chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+    """Check a ticket file ('-' for stdin) and write results to out_path ('-' for stdout)"""
+    source = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    target = sys.stdout if not out_path or out_path == '-' else open(out_path, 'w', encoding='utf-8')
+    try:
+        return checker.check_stream(source, target, chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
@@ -0,0 +1,294 @@
+"""
+LottoAI Wheels
+Covering ticket sets over a number pool, found by bitset greedy and local search across cores
+"""
+
+import os
+import json
+import time
+import heapq
+import tempfile
+from datetime import datetime
+from itertools import combinations
+from math import comb
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fetch_pool import run_processes
+
+MAIN_COUNT = 5
+# Largest pool searched; C(20, 5) = 15,504 candidate tickets
+MAX_POOL = 20
+# Default location of precomputed wheels
+WHEEL_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'data', 'wheel_cache')
+# Wheels shipped with the code (at least the one published in wheel.json), read when the cache has none
+BUNDLED_DIR = os.path.join(os.path.dirname(__file__), 'wheels')
+# Time for setup plus search of a wheel missing from the cache, keeps interactive requests under a second
+INTERACTIVE_BUDGET = 0.6
+# Search time per worker when precomputing
+PRECOMPUTE_BUDGET = 20.0
+# Tickets dropped per local search step before refilling greedily
+PERTURB = 2
+
+# Tickets as tuples of pool positions 0..pool_size-1
+Wheel = List[Tuple[int, ...]]
+
+
+def validate(pool_size: int, guarantee: int, if_drawn: int):
+    if not MAIN_COUNT <= pool_size <= MAX_POOL:
+        raise ValueError(f"Pool must hold {MAIN_COUNT} to {MAX_POOL} numbers")
+    if not 1 <= guarantee <= if_drawn <= MAIN_COUNT:
+        raise ValueError(f"Need 1 <= guarantee <= if_drawn <= {MAIN_COUNT}")
+
+
+def _masks(pool_size: int, size: int) -> Tuple[np.ndarray, List[Tuple[int, ...]]]:
+    subsets = list(combinations(range(pool_size), size))
+    masks = np.array([sum(1 << i for i in s) for s in subsets], dtype=np.uint32)
+    return masks, subsets
+
+
+def _check(deadline: Optional[float]):
+    if deadline is not None and time.monotonic() > deadline:
+        raise TimeoutError("Wheel search ran out of time before finding a cover")
+
+
+class CoverProblem:
+    """Which candidate tickets cover which drawn subsets, as packed bit rows
+
+    Candidate i covers target j when they share at least `guarantee`
+    numbers. Row i of `bits` holds those targets as uint64 words. Setup
+    raises TimeoutError once `deadline` (a time.monotonic() value) passes.
+    """
+
+    def __init__(self, pool_size: int, guarantee: int, if_drawn: int, chunk: int = 1024,
+                 deadline: Optional[float] = None):
+        validate(pool_size, guarantee, if_drawn)
+        self.key = (pool_size, guarantee, if_drawn)
+        candidates, self.tickets = _masks(pool_size, MAIN_COUNT)
+        targets, _ = _masks(pool_size, if_drawn)
+        self.targets = len(targets)
+        words = (self.targets + 63) // 64
+
+        self.bits = np.zeros((len(candidates), words * 8), dtype=np.uint8)
+        for start in range(0, len(candidates), chunk):
+            _check(deadline)
+            shared = np.bitwise_count(candidates[start:start + chunk, None] & targets[None, :])
+            self.bits[start:start + chunk, :(self.targets + 7) // 8] = np.packbits(shared >= guarantee, axis=1)
+        self.bits = self.bits.view(np.uint64)
+        self.everything = np.zeros(words * 8, dtype=np.uint8)
+        self.everything[:(self.targets + 7) // 8] = np.packbits(np.ones(self.targets, dtype=bool))
+        self.everything = self.everything.view(np.uint64)
+
+    def uncovered(self, chosen: Sequence[int]) -> np.ndarray:
+        if not len(chosen):
+            return self.everything.copy()
+        return self.everything & ~np.bitwise_or.reduce(self.bits[list(chosen)], axis=0)
+
+    def greedy(self, rng: np.random.Generator, chosen: Sequence[int] = (),
+               deadline: Optional[float] = None) -> List[int]:
+        """Extend `chosen` until every target is covered, taking the biggest gain each time
+
+        Gains only shrink as targets get covered, so a stale heap entry is
+        re-scored when it surfaces (lazy greedy). Ties break randomly.
+        Raises TimeoutError once `deadline` passes.
+        """
+        chosen = list(chosen)
+        uncovered = self.uncovered(chosen)
+        gains = np.bitwise_count(self.bits & uncovered).sum(axis=1)
+        noise = rng.random(len(gains))
+        heap = [(-int(g), noise[i], i) for i, g in enumerate(gains.tolist()) if g]
+        heapq.heapify(heap)
+        while uncovered.any() and heap:
+            _check(deadline)
+            _, tie, i = heapq.heappop(heap)
+            gain = int(np.bitwise_count(self.bits[i] & uncovered).sum())
+            if not gain:
+                continue
+            if heap and gain < -heap[0][0]:
+                heapq.heappush(heap, (-gain, tie, i))
+                continue
+            chosen.append(i)
+            uncovered &= ~self.bits[i]
+        return self.prune(chosen, rng, deadline)
+
+    def _row(self, ticket: int) -> np.ndarray:
+        return np.unpackbits(self.bits[ticket].view(np.uint8), count=self.targets).astype(bool)
+
+    def prune(self, chosen: List[int], rng: np.random.Generator,
+              deadline: Optional[float] = None) -> List[int]:
+        """Drop tickets whose targets are all covered by the others
+
+        Rows are unpacked one at a time, so memory stays at one count per target.
+        """
+        order = [int(t) for t in rng.permutation(chosen)]
+        cover = np.zeros(self.targets, dtype=np.int32)
+        for ticket in order:
+            cover += self._row(ticket)
+        kept = []
+        for ticket in order:
+            _check(deadline)
+            row = self._row(ticket)
+            if (cover[row] >= 2).all():
+                cover[row] -= 1
+            else:
+                kept.append(ticket)
+        return kept
+
+    def search(self, seed: int, deadline: float) -> List[int]:
+        """Greedy start, then drop-and-refill local search until `deadline` (a time.monotonic() value)
+
+        Raises TimeoutError if even the greedy cover can't be found in time.
+        """
+        rng = np.random.default_rng(seed)
+        best = self.greedy(rng, deadline=deadline)
+        while time.monotonic() < deadline and len(best) > 1:
+            keep = list(rng.permutation(best)[:max(len(best) - PERTURB, 0)])
+            try:
+                candidate = self.greedy(rng, keep, deadline)
+            except TimeoutError:
+                break
+            if len(candidate) <= len(best):
+                best = candidate
+        return best
+
+    def wheel(self, chosen: Sequence[int]) -> Wheel:
+        return sorted(self.tickets[i] for i in chosen)
+
+
+def search_wheel(pool_size: int, guarantee: int, if_drawn: int, seed: int, budget: float) -> Wheel:
+    """One search run of `budget` seconds including setup; top-level so worker processes can run it
+
+    Wheels guaranteeing all five numbers are every combination and need
+    no search. Raises TimeoutError if no cover is found within `budget`.
+    """
+    if guarantee == MAIN_COUNT:
+        return list(combinations(range(pool_size), MAIN_COUNT))
+    deadline = time.monotonic() + budget
+    problem = CoverProblem(pool_size, guarantee, if_drawn, deadline=deadline)
+    return problem.wheel(problem.search(seed, deadline))
+
+
+def lower_bound(pool_size: int, guarantee: int, if_drawn: int) -> int:
+    """Counting bound: drawn subsets over the most one ticket can cover"""
+    per_ticket = sum(comb(MAIN_COUNT, j) * comb(pool_size - MAIN_COUNT, if_drawn - j)
+                     for j in range(guarantee, min(MAIN_COUNT, if_drawn) + 1))
+    return -(-comb(pool_size, if_drawn) // per_ticket)
+
+
+class WheelCache:
+    """Best known wheel per (pool size, guarantee, if drawn), one JSON file each
+
+    Lookups fall back to the read-only `bundled_dir`; a search result is
+    only stored when it beats both.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = WHEEL_CACHE_DIR, bundled_dir: Optional[str] = BUNDLED_DIR):
+        self.cache_dir = cache_dir
+        self.bundled_dir = bundled_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _path(directory: str, pool_size: int, guarantee: int, if_drawn: int) -> str:
+        return os.path.join(directory, f'{pool_size}-{guarantee}-{if_drawn}.json')
+
+    def get(self, pool_size: int, guarantee: int, if_drawn: int) -> Optional[Wheel]:
+        found = []
+        for directory in (self.cache_dir, self.bundled_dir):
+            if not directory:
+                continue
+            try:
+                with open(self._path(directory, pool_size, guarantee, if_drawn), encoding='utf-8') as f:
+                    found.append([tuple(t) for t in json.load(f)['tickets']])
+            except (OSError, ValueError, KeyError):
+                continue
+        return min(found, key=len) if found else None
+
+    def put(self, pool_size: int, guarantee: int, if_drawn: int, wheel: Wheel) -> bool:
+        """Store the wheel if it beats the cached one, returns True if stored"""
+        if not self.cache_dir:
+            return False
+        cached = self.get(pool_size, guarantee, if_drawn)
+        if cached is not None and len(cached) <= len(wheel):
+            return False
+        entry = {
+            'pool_size': pool_size,
+            'guarantee': guarantee,
+            'if_drawn': if_drawn,
+            'tickets': [list(t) for t in wheel],
+            'lower_bound': lower_bound(pool_size, guarantee, if_drawn),
+            'generated_at': datetime.now().isoformat()
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._path(self.cache_dir, pool_size, guarantee, if_drawn))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"  Wheel cache write error: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return False
+        return True
+
+
+def find_wheel(pool_size: int, guarantee: int, if_drawn: int, cache: Optional[WheelCache] = None,
+               budget: float = INTERACTIVE_BUDGET, workers: int = 1, seed: int = 0) -> Wheel:
+    """Cached wheel, or the best of `workers` parallel searches of `budget` seconds each
+
+    Raises ValueError when the shape is too large to search within
+    `budget` and has not been precomputed.
+    """
+    validate(pool_size, guarantee, if_drawn)
+    cached = cache.get(pool_size, guarantee, if_drawn) if cache else None
+    if cached is not None:
+        return cached
+
+    if workers > 1:
+        # Spawned workers rebuild the bit rows themselves, cheaper than pickling them
+        runs = run_processes(search_wheel, {f'seed-{seed + i}': (pool_size, guarantee, if_drawn, seed + i, budget)
+                                            for i in range(workers)}, workers)
+        found = [w for w in runs.values() if not isinstance(w, Exception)]
+        failures = [e for e in runs.values() if isinstance(e, Exception) and not isinstance(e, TimeoutError)]
+        if not found and failures:
+            raise failures[0]
+        wheel = min(found, key=len) if found else None
+    else:
+        try:
+            wheel = search_wheel(pool_size, guarantee, if_drawn, seed, budget)
+        except TimeoutError:
+            wheel = None
+    if wheel is None:
+        raise ValueError(f"No precomputed wheel for {guarantee} if {if_drawn} from {pool_size} numbers "
+                         f"and it can't be searched in {budget}s; run --precompute-wheels {pool_size}")
+    if cache:
+        cache.put(pool_size, guarantee, if_drawn, wheel)
+    return wheel
+
+
+def precompute_wheels(cache: WheelCache, pool_sizes: Sequence[int], budget: float = PRECOMPUTE_BUDGET,
+                      workers: Optional[int] = None) -> Dict[str, int]:
+    """Search every (pool size, guarantee, if drawn) combination and keep improvements, returns sizes"""
+    workers = workers or os.cpu_count() or 1
+    sizes = {}
+    for pool_size in pool_sizes:
+        for if_drawn in range(1, MAIN_COUNT + 1):
+            for guarantee in range(1, if_drawn + 1):
+                runs = run_processes(search_wheel, {f'seed-{i}': (pool_size, guarantee, if_drawn, i, budget)
+                                                    for i in range(workers)}, workers)
+                found = [w for w in runs.values() if not isinstance(w, Exception)]
+                if found:
+                    cache.put(pool_size, guarantee, if_drawn, min(found, key=len))
+                else:
+                    print(f"  Wheel search error: {next(iter(runs.values()))}")
+                best = cache.get(pool_size, guarantee, if_drawn) or []
+                sizes[f'{pool_size}-{guarantee}-{if_drawn}'] = len(best)
+                print(f"  {pool_size} numbers, {guarantee} if {if_drawn}: {len(best)} tickets "
+                      f"(bound {lower_bound(pool_size, guarantee, if_drawn)})")
+    return sizes
+
+
+def apply_wheel(pool: Sequence[int], wheel: Wheel) -> List[List[int]]:
+    """Map pool positions to the user's numbers"""
+    return [sorted(pool[i] for i in ticket) for ticket in wheel]